@@ -0,0 +1,125 @@
+'''
+Times loading a large multi-slate DraftKings salary CSV, written from
+the synthetic slates in benchmarks.slates, with and without raw columns
+and as a PlayerPool. The first row is the per-row DictReader path
+salary_download used to take, for comparison.
+
+    python -m benchmarks.ingest
+    python -m benchmarks.ingest --slates 40
+'''
+import argparse
+import csv
+import gc
+import os
+import tempfile
+import time
+from draftfast import rules
+from draftfast.csv_parse import salary_download
+from benchmarks.slates import generate_slate
+
+SLATE_RULE_SETS = [
+    rules.DK_NBA_RULE_SET,
+    rules.DK_NFL_RULE_SET,
+    rules.DK_MLB_RULE_SET,
+]
+SLATES = 12
+POOL_SIZE = 500
+# loads take tens of milliseconds; the best of several smooths noise
+REPEATS = 7
+HEADER = ['Position', 'Name', 'ID', 'Roster Position', 'Salary',
+          'Game Info', 'TeamAbbrev', 'AvgPointsPerGame']
+
+
+def write_salaries(path: str, slates: int) -> int:
+    '''
+    Writes one row per distinct player of each slate and returns the
+    number of rows.
+    '''
+    rows = 0
+    with open(path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(HEADER)
+        for s in range(slates):
+            rule_set = SLATE_RULE_SETS[s % len(SLATE_RULE_SETS)]
+            seen = set()
+            for p in generate_slate(rule_set, pool_size=POOL_SIZE, seed=s):
+                if p.name in seen:
+                    continue
+                seen.add(p.name)
+                rows += 1
+                writer.writerow([
+                    p.possible_positions,
+                    'S{} {}'.format(s, p.name),
+                    rows,
+                    p.possible_positions,
+                    int(p.cost),
+                    '{} 07:30PM ET'.format(p.matchup),
+                    p.team,
+                    p.proj,
+                ])
+    return rows
+
+
+def _dict_reader_players(path: str) -> list:
+    players = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as csv_file:
+        for row in csv.DictReader(csv_file):
+            for pos in row['Position'].split('/'):
+                player = salary_download.generate_player(
+                    pos=pos,
+                    row=row,
+                    game=rules.DRAFT_KINGS,
+                )
+                salary_download._set_projections(None, player, False)
+                players.append(player)
+    return players
+
+
+def benchmark(path: str) -> list:
+    cases = [
+        ('dict rows', lambda: _dict_reader_players(path)),
+        ('players', lambda: salary_download.generate_players_from_csvs(
+            path, rules.DRAFT_KINGS,
+        )),
+        ('players, no raw', lambda: salary_download.generate_players_from_csvs(
+            path, rules.DRAFT_KINGS, raw_columns=False,
+        )),
+        ('pool, no raw', lambda: salary_download.generate_players_from_csvs(
+            path, rules.DRAFT_KINGS, raw_columns=False, pool=True,
+        )),
+    ]
+    results = []
+    for name, load in cases:
+        best = float('inf')
+        for _ in range(REPEATS):
+            # the previous load's players would otherwise be collected
+            # during this one
+            players = None
+            gc.collect()
+            start = time.perf_counter()
+            players = load()
+            best = min(best, time.perf_counter() - start)
+        results.append((name, len(players), best))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--slates', type=int, default=SLATES)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'salaries.csv')
+        rows = write_salaries(path, args.slates)
+        print('{} rows, {} slates'.format(rows, args.slates))
+        print('{:<18} {:>8} {:>10} {:>12}'.format(
+            'path', 'players', 'ms', 'rows/sec',
+        ))
+        for name, players, seconds in benchmark(path):
+            print('{:<18} {:>8} {:>10.1f} {:>12.0f}'.format(
+                name, players, 1000 * seconds, rows / seconds,
+            ))
+
+
+if __name__ == '__main__':
+    main()
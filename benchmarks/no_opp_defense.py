@@ -0,0 +1,76 @@
+'''
+Compares the pairwise and big-M formulations of
+no_offense_against_defense on the DraftKings NFL test slate.
+
+    python -m benchmarks.no_opp_defense
+'''
+import os
+import time
+from draftfast import rules
+from draftfast.csv_parse import salary_download
+from draftfast.lineup_constraints import LineupConstraints
+from draftfast.optimizer import Optimizer
+from draftfast.settings import OptimizerSettings, PAIRWISE, BIG_M
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(CURRENT_DIR, '..', 'draftfast', 'test', 'data')
+SALARY_FILE = os.path.join(DATA_DIR, 'dk-nfl-salaries.csv')
+PROJECTION_FILE = os.path.join(DATA_DIR, 'dk-nfl-projections.csv')
+REPEATS = 5
+
+
+def benchmark(players, formulation):
+    build_time = 0
+    solve_time = 0
+    for _ in range(REPEATS):
+        optimizer = Optimizer(
+            players=players,
+            rule_set=rules.DK_NFL_RULE_SET,
+            settings=OptimizerSettings(
+                no_offense_against_defense=True,
+                no_opp_defense_formulation=formulation,
+            ),
+            lineup_constraints=LineupConstraints(),
+            exposure_dict=dict(),
+        )
+        start = time.perf_counter()
+        optimizer.build()
+        build_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        solved = optimizer.solve()
+        solve_time += time.perf_counter() - start
+
+    return {
+        'formulation': formulation,
+        'constraints': optimizer.solver.NumConstraints(),
+        'variables': optimizer.solver.NumVariables(),
+        'build_ms': 1000 * build_time / REPEATS,
+        'solve_ms': 1000 * solve_time / REPEATS,
+        'objective': optimizer.solver.Objective().Value() if solved else None,
+    }
+
+
+def main():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=SALARY_FILE,
+        projection_file_location=PROJECTION_FILE,
+        game=rules.DRAFT_KINGS,
+    )
+    print('{} players'.format(len(players)))
+    print('{:<10} {:>12} {:>10} {:>10} {:>10} {:>10}'.format(
+        'model', 'constraints', 'variables', 'build ms', 'solve ms',
+        'objective',
+    ))
+    for formulation in (PAIRWISE, BIG_M):
+        result = benchmark(players, formulation)
+        print(
+            '{formulation:<10} {constraints:>12} {variables:>10} '
+            '{build_ms:>10.1f} {solve_ms:>10.1f} {objective:>10.2f}'.format(
+                **result
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+'''
+Deterministic synthetic slates for every RuleSet in draftfast.rules.
+
+Salaries are drawn around the average salary per roster slot so the
+cap binds, and projections scale with salary plus noise, so optimal
+lineups are not trivially the most expensive players.
+'''
+import random
+from draftfast import rules
+from draftfast.orm import Player
+from draftfast.rules import RuleSet
+from draftfast.showdown.orm import ShowdownPlayer
+
+CAPTAIN_MULTIPLIER = 1.5
+
+# real positions drawn for showdown slates, which only list CPT / FLEX
+SHOWDOWN_POSITIONS = {
+    'NFL_SHOWDOWN': ['QB', 'RB', 'WR', 'TE'],
+    'NBA_SHOWDOWN': ['PG', 'SG', 'SF', 'PF', 'C'],
+    'MLB_SHOWDOWN': ['P', 'C', '1B', '2B', '3B', 'SS', 'OF'],
+    'NHL_SHOWDOWN': ['C', 'W', 'D', 'G'],
+    'CSGO_SHOWDOWN': ['P'],
+}
+
+
+def rule_sets() -> dict:
+    '''
+    Every optimizable RuleSet in draftfast.rules keyed by name. Pick'em
+    rule sets are left out; they are not solved by the optimizer.
+    '''
+    return {
+        name: value
+        for name, value in sorted(vars(rules).items())
+        if isinstance(value, RuleSet) and value.game_type != 'pickem'
+    }
+
+
+def generate_slate(
+    rule_set: RuleSet,
+    pool_size: int = 200,
+    teams: int = None,
+    multi_position_rate: float = 0.2,
+    seed: int = 0,
+) -> list:
+    '''
+    Returns a player pool for rule_set. pool_size counts distinct
+    players; multi-position players are emitted once per position the
+    way salary_download does, and showdown players once as FLEX and
+    once as captain. teams defaults to 2 for showdown and 10 otherwise.
+    '''
+    rng = random.Random(seed)
+    showdown = rule_set.game_type == 'showdown'
+    if teams is None:
+        teams = 2 if showdown else 10
+
+    team_names = ['T{:02d}'.format(i) for i in range(max(teams, 2))]
+    matchups = {}
+    for home, away in zip(team_names[::2], team_names[1::2]):
+        matchups[home] = matchups[away] = '{}@{}'.format(away, home)
+    if len(team_names) % 2:
+        # odd team out plays the first team of the slate
+        last = team_names[-1]
+        matchups[last] = '{}@{}'.format(last, team_names[0])
+
+    if showdown:
+        return _showdown_slate(rule_set, rng, pool_size, team_names,
+                               matchups)
+
+    return _classic_slate(rule_set, rng, pool_size, team_names, matchups,
+                          multi_position_rate)
+
+
+def _classic_slate(rule_set, rng, pool_size, team_names, matchups,
+                   multi_position_rate):
+    positions = [p[0] for p in rule_set.position_limits]
+    upper_bounds = [p[2] for p in rule_set.position_limits]
+    total = sum(upper_bounds)
+    counts = [
+        max(ub * 3, round(pool_size * ub / total))
+        for ub in upper_bounds
+    ]
+
+    players = []
+    for pos, count in zip(positions, counts):
+        for i in range(count):
+            team = team_names[i % len(team_names)]
+            cost, proj = _cost_and_proj(rule_set, rng)
+            eligible = [pos]
+            if len(positions) > 1 and rng.random() < multi_position_rate:
+                eligible.append(
+                    rng.choice([p for p in positions if p != pos])
+                )
+            name = '{} {} {}'.format(team, pos, i)
+            for p in eligible:
+                players.append(Player(
+                    pos=p,
+                    name=name,
+                    cost=cost,
+                    proj=proj,
+                    team=team,
+                    matchup=matchups[team],
+                    possible_positions='/'.join(eligible),
+                    multi_position=len(eligible) > 1,
+                ))
+
+    return players
+
+
+def _showdown_slate(rule_set, rng, pool_size, team_names, matchups):
+    positions = list(SHOWDOWN_POSITIONS.get(rule_set.league, ['FLEX']))
+    positions += rule_set.defensive_positions or []
+    has_captain = 'CPT' in [p[0] for p in rule_set.position_limits]
+    if has_captain:
+        # every player is listed twice, as FLEX and as captain
+        pool_size = pool_size // 2
+
+    players = []
+    for i in range(max(pool_size, rule_set.roster_size * 2)):
+        team = team_names[i % len(team_names)]
+        pos = positions[i % len(positions)]
+        cost, proj = _cost_and_proj(rule_set, rng)
+        player = Player(
+            pos=pos,
+            name='{} {} {}'.format(team, pos, i),
+            cost=cost,
+            proj=proj,
+            team=team,
+            matchup=matchups[team],
+            possible_positions=pos,
+        )
+        players.append(ShowdownPlayer(player))
+
+        if has_captain:
+            captain = Player(
+                pos=pos,
+                name=player.name,
+                # FanDuel MVPs score more but cost the same
+                cost=cost * CAPTAIN_MULTIPLIER
+                if rule_set.site == rules.DRAFT_KINGS else cost,
+                proj=round(proj * CAPTAIN_MULTIPLIER, 2),
+                team=team,
+                matchup=matchups[team],
+                possible_positions=pos,
+            )
+            players.append(ShowdownPlayer(captain, captain=True))
+
+    return players
+
+
+def _cost_and_proj(rule_set, rng):
+    average = rule_set.salary_max / rule_set.roster_size
+    cost = round(average * rng.uniform(0.5, 1.6), -2)
+    proj = round(cost / 1000 * rng.uniform(3.5, 6.5), 2)
+    return cost, proj
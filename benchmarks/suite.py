@@ -0,0 +1,323 @@
+'''
+Benchmarks the optimizer on synthetic slates (see benchmarks.slates)
+and compares the results against a stored baseline.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --scenario multi_exposure --iterations 20
+    python -m benchmarks.suite --save-baseline
+
+Every scenario is run twice: once for wall time and once under
+tracemalloc for peak memory, which would otherwise skew timings. Model
+size comes from SolveStats. The run fails when lineups/sec drops or
+peak memory grows by more than --tolerance against the baseline, when
+the model grows, or when the best lineup's projection changes. Timings
+are machine dependent; re-save the baseline when moving machines, and
+otherwise only for the scenarios a change affects:
+
+    python -m benchmarks.suite --scenario top_k --save-baseline
+'''
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from draftfast import rules
+from draftfast.optimize import run, run_multi, run_top_k
+from draftfast.settings import OptimizerSettings, PlayerPoolSettings, \
+    Stack
+from benchmarks.slates import generate_slate, rule_sets
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(CURRENT_DIR, 'baseline.json')
+MULTI_ITERATIONS = 150
+# single lineups solve in milliseconds; time several to smooth noise
+SINGLE_REPEATS = 5
+TOLERANCE = 0.25
+
+
+def _top_exposure_bounds(slate):
+    # caps the ten best players and forces a little of the next three
+    names = []
+    for p in sorted(slate, key=lambda p: -p.proj):
+        if p.name not in names:
+            names.append(p.name)
+    return [
+        {'name': name, 'min': 0, 'max': 0.3} for name in names[:10]
+    ] + [
+        {'name': name, 'min': 0.2, 'max': 1} for name in names[10:13]
+    ]
+
+
+def scenarios() -> list:
+    '''
+    A single lineup for every RuleSet, plus multi-lineup scenarios
+    covering exposures, stacks, no_offense_against_defense, showdown
+    and randomized projections, with and without lazy uniqueness. The
+    top_k scenarios compare run_top_k against run_multi on the same
+    slate.
+    '''
+    single = [
+        {
+            'name': 'single:{}'.format(name),
+            'rule_set': rule_set,
+            'iterations': 1,
+        }
+        for name, rule_set in rule_sets().items()
+    ]
+    return single + [
+        {
+            'name': 'multi_exposure',
+            'rule_set': rules.DK_NBA_RULE_SET,
+            'iterations': MULTI_ITERATIONS,
+            'exposure_bounds': _top_exposure_bounds,
+        },
+        {
+            'name': 'stacks',
+            'rule_set': rules.DK_NFL_RULE_SET,
+            'iterations': 20,
+            'settings': lambda: OptimizerSettings(
+                stacks=[Stack(team='T00', count=3)],
+            ),
+        },
+        {
+            'name': 'no_opp_defense',
+            'rule_set': rules.DK_NFL_RULE_SET,
+            'iterations': 20,
+            'settings': lambda: OptimizerSettings(
+                no_offense_against_defense=True,
+            ),
+        },
+        {
+            'name': 'showdown',
+            'rule_set': rules.DK_NFL_SHOWDOWN_RULE_SET,
+            'iterations': 20,
+        },
+        {
+            'name': 'randomize',
+            'rule_set': rules.DK_NBA_RULE_SET,
+            'iterations': 50,
+            'settings': lambda: OptimizerSettings(persistent_model=True),
+            'player_settings': PlayerPoolSettings(randomize=0.15),
+            # seeds the projection draws
+            'random_seed': 1,
+        },
+        {
+            'name': 'randomize_lazy',
+            'rule_set': rules.DK_NBA_RULE_SET,
+            'iterations': MULTI_ITERATIONS,
+            'settings': lambda: OptimizerSettings(
+                persistent_model=True,
+                lazy_uniqueness=True,
+            ),
+            'player_settings': PlayerPoolSettings(randomize=0.15),
+            'random_seed': 1,
+        },
+        {
+            'name': 'top_k',
+            'rule_set': rules.DK_NFL_RULE_SET,
+            'iterations': 20,
+            'top_k': True,
+        },
+        {
+            'name': 'top_k:run_multi',
+            'rule_set': rules.DK_NFL_RULE_SET,
+            'iterations': 20,
+            'settings': lambda: OptimizerSettings(persistent_model=True),
+        },
+    ]
+
+
+def _generate(scenario, slate, iterations, optimizer_settings):
+    if iterations == 1:
+        roster = run(
+            rule_set=scenario['rule_set'],
+            player_pool=slate,
+            optimizer_settings=optimizer_settings,
+        )
+        return [roster] if roster else []
+
+    if scenario.get('top_k'):
+        return run_top_k(
+            k=iterations,
+            rule_set=scenario['rule_set'],
+            player_pool=slate,
+            optimizer_settings=optimizer_settings,
+        )
+
+    exposure_bounds = scenario.get('exposure_bounds')
+    rosters, _ = run_multi(
+        iterations=iterations,
+        rule_set=scenario['rule_set'],
+        player_pool=slate,
+        optimizer_settings=optimizer_settings,
+        player_settings=scenario.get('player_settings',
+                                     PlayerPoolSettings()),
+        exposure_bounds=exposure_bounds(slate) if exposure_bounds else [],
+        exposure_random_seed=scenario.get('random_seed'),
+    )
+    return rosters
+
+
+def measure(scenario, config) -> dict:
+    slate = generate_slate(
+        scenario['rule_set'],
+        pool_size=config['pool_size'],
+        teams=config['teams'],
+        multi_position_rate=config['multi_position_rate'],
+        seed=config['seed'],
+    )
+    iterations = scenario['iterations']
+    if iterations > 1 and config['iterations']:
+        iterations = config['iterations']
+    make_settings = scenario.get('settings', OptimizerSettings)
+
+    repeats = SINGLE_REPEATS if iterations == 1 else 1
+    elapsed = 0
+    for _ in range(repeats):
+        stats = []
+        optimizer_settings = make_settings()
+        optimizer_settings.stats_callback = stats.append
+        start = time.perf_counter()
+        rosters = _generate(scenario, slate, iterations, optimizer_settings)
+        elapsed += time.perf_counter() - start
+
+    tracemalloc.start()
+    _generate(scenario, slate, iterations, make_settings())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'lineups': len(rosters),
+        'seconds': elapsed / repeats,
+        'lineups_per_sec': len(rosters) * repeats / elapsed if elapsed else 0,
+        'peak_mb': peak / 2 ** 20,
+        'variables': max([s.variables for s in stats] or [0]),
+        'constraints': max([s.constraints for s in stats] or [0]),
+        'objective': round(rosters[0].projected(), 2) if rosters else None,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    '''
+    Returns a description of every regression against the baseline.
+    '''
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+
+        floor = base['lineups_per_sec'] * (1 - tolerance)
+        if result['lineups_per_sec'] < floor:
+            regressions.append('{}: lineups/sec {:.1f} -> {:.1f}'.format(
+                name, base['lineups_per_sec'], result['lineups_per_sec'],
+            ))
+        if result['peak_mb'] > base['peak_mb'] * (1 + tolerance):
+            regressions.append('{}: peak memory {:.2f} -> {:.2f} MB'.format(
+                name, base['peak_mb'], result['peak_mb'],
+            ))
+        for key in ('variables', 'constraints'):
+            if result[key] > base[key]:
+                regressions.append('{}: {} {} -> {}'.format(
+                    name, key, base[key], result[key],
+                ))
+        if result['lineups'] != base['lineups']:
+            regressions.append('{}: lineups {} -> {}'.format(
+                name, base['lineups'], result['lineups'],
+            ))
+        if result['objective'] != base['objective']:
+            regressions.append('{}: best projection {} -> {}'.format(
+                name, base['objective'], result['objective'],
+            ))
+
+    return regressions
+
+
+def _print_results(results):
+    row = '{:<36} {:>8} {:>12} {:>9} {:>10} {:>12} {:>10}'
+    print(row.format(
+        'scenario', 'lineups', 'lineups/sec', 'peak MB', 'variables',
+        'constraints', 'best',
+    ))
+    for name, r in results.items():
+        print(row.format(
+            name,
+            r['lineups'],
+            '{:.1f}'.format(r['lineups_per_sec']),
+            '{:.2f}'.format(r['peak_mb']),
+            r['variables'],
+            r['constraints'],
+            r['objective'],
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--scenario', action='append', default=[],
+                        help='only run scenarios starting with this name')
+    parser.add_argument('--pool-size', type=int, default=200)
+    parser.add_argument('--teams', type=int, default=None)
+    parser.add_argument('--multi-position-rate', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--iterations', type=int, default=None,
+                        help='lineups for multi-lineup scenarios')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    config = {
+        'pool_size': args.pool_size,
+        'teams': args.teams,
+        'multi_position_rate': args.multi_position_rate,
+        'seed': args.seed,
+        'iterations': args.iterations,
+    }
+
+    results = {}
+    for scenario in scenarios():
+        if args.scenario and not any(
+            scenario['name'].startswith(s) for s in args.scenario
+        ):
+            continue
+        results[scenario['name']] = measure(scenario, config)
+
+    _print_results(results)
+
+    if args.save_baseline:
+        saved = dict()
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            # keep scenarios that were not re-run
+            if baseline['config'] == config:
+                saved = baseline['results']
+        saved.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'config': config, 'results': saved}, f,
+                      indent=2, sort_keys=True)
+        print('Saved baseline to {}'.format(args.baseline))
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline at {}'.format(args.baseline))
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['config'] != config:
+        print('Baseline was saved with {}; not comparing'.format(
+            baseline['config']
+        ))
+        return 0
+
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for regression in regressions:
+        print('REGRESSION {}'.format(regression))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
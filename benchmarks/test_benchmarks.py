@@ -0,0 +1,38 @@
+from nose import tools as ntools
+from draftfast.optimize import run
+from draftfast.settings import OptimizerSettings
+from benchmarks.slates import generate_slate, rule_sets
+from benchmarks.suite import compare
+
+
+def test_synthetic_slates_solve():
+    for name, rule_set in rule_sets().items():
+        slate = generate_slate(rule_set, pool_size=60)
+        ntools.assert_equal(
+            [p.name for p in slate],
+            [p.name for p in generate_slate(rule_set, pool_size=60)],
+        )
+
+        roster = run(
+            rule_set=rule_set,
+            player_pool=slate,
+            optimizer_settings=OptimizerSettings(),
+        )
+        ntools.assert_not_equal(roster, None, name)
+        ntools.assert_equal(len(roster.players), rule_set.roster_size)
+
+
+def test_compare_baseline():
+    base = {
+        'lineups': 150,
+        'lineups_per_sec': 10.0,
+        'peak_mb': 4.0,
+        'variables': 300,
+        'constraints': 40,
+        'objective': 320.5,
+    }
+    ntools.assert_equal(compare({'a': dict(base)}, {'a': base}, 0.25), [])
+
+    slower = dict(base, lineups_per_sec=7.0, constraints=41)
+    regressions = compare({'a': slower}, {'a': base}, 0.25)
+    ntools.assert_equal(len(regressions), 2)
@@ -1,11 +1,15 @@
 from . import (
+    cache,
     mlb_upload,
+    projection_index,
     upload,
     salary_download,
     uploaders,
 )
 
+assert cache
 assert mlb_upload
+assert projection_index
 assert upload
 assert salary_download
 assert uploaders
@@ -0,0 +1,332 @@
+'''
+Cache of parsed salary CSVs.
+
+An entry is keyed by the content of the salary and projection files and
+the parse options. On disk it holds the players as NumPy columns plus
+one string table, so a new worker process skips CSV parsing. A process
+also keeps the decoded columns of its last few loads in memory, so a
+job on an unchanged slate skips reading the entry too. Every load
+builds new players, which callers are free to modify.
+'''
+import collections
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from draftfast.orm import Player
+from draftfast.pickem.pickem_orm import TieredPlayer
+from draftfast.player_pool import PlayerPool
+from draftfast.showdown.orm import ShowdownPlayer
+from draftfast.csv_parse.salary_download import generate_players_from_csvs
+
+# bump when the layout below changes; older entries are then ignored
+VERSION = 3
+DEFAULT_CACHE_DIR = os.path.join('~', '.cache', 'draftfast')
+CLASSIC = 'classic'
+PICKEM = 'pickem'
+SHOWDOWN = 'showdown'
+# string codes of the record table; -1 is None
+STRING_FIELDS = ('name', 'pos', 'team', 'matchup', 'possible_positions',
+                 'tier')
+RECORD_DTYPE = np.dtype(
+    [(f, np.int32) for f in STRING_FIELDS] + [
+        ('cost', np.float64),
+        ('proj', np.float64),
+        ('average_score', np.float64),
+        ('multi_position', np.bool_),
+        # row of the CSV kept in kv_store, or -1
+        ('row', np.int32),
+    ]
+)
+# showdown slots; row -1 shares the base record's kv_store and a NaN
+# cost means base.cost * cost_multiplier
+SLOT_DTYPE = np.dtype([
+    ('base', np.int32),
+    ('captain', np.bool_),
+    ('cost_multiplier', np.float64),
+    ('cost', np.float64),
+    ('row', np.int32),
+])
+SEPARATOR = '\x00'
+# loads kept in memory per process
+MEMORY_ENTRIES = 8
+
+_loaded = collections.OrderedDict()
+
+
+def load_players(
+    salary_file_location: str,
+    game: str,
+    projection_file_location='',
+    verbose=False,
+    encoding='utf-8',
+    errors='replace',
+    ruleset=None,
+    raw_columns=True,
+    pool=False,
+    cache_dir=None,
+    min_similarity=None,
+):
+    '''
+    generate_players_from_csvs, read from memory or from cache_dir when
+    the files and options were loaded before. cache_dir defaults to
+    ~/.cache/draftfast. Missing projections are only reported by
+    verbose when the files are parsed. Each call returns new players.
+    '''
+    key = fingerprint(
+        salary_file_location,
+        projection_file_location,
+        game=game,
+        encoding=encoding,
+        errors=errors,
+        ruleset=ruleset,
+        raw_columns=raw_columns,
+        min_similarity=min_similarity,
+    )
+    entry = os.path.join(
+        os.path.expanduser(cache_dir or DEFAULT_CACHE_DIR),
+        key,
+    )
+
+    if key in _loaded:
+        _loaded.move_to_end(key)
+        players = build_players(_loaded[key])
+    else:
+        if not os.path.isdir(entry):
+            players = generate_players_from_csvs(
+                salary_file_location=salary_file_location,
+                game=game,
+                projection_file_location=projection_file_location,
+                verbose=verbose,
+                encoding=encoding,
+                errors=errors,
+                ruleset=ruleset,
+                raw_columns=raw_columns,
+                min_similarity=min_similarity,
+            )
+            write_entry(entry, players, _kind(ruleset))
+            columns = read_columns(entry)
+        else:
+            columns = read_columns(entry)
+            players = build_players(columns)
+        _loaded[key] = columns
+        while len(_loaded) > MEMORY_ENTRIES:
+            _loaded.popitem(last=False)
+
+    if pool:
+        return PlayerPool(players)
+    return players
+
+
+def clear_memory():
+    '''
+    Drops the columns kept in memory; disk entries stay.
+    '''
+    _loaded.clear()
+
+
+def fingerprint(salary_file_location: str, projection_file_location='',
+                **options) -> str:
+    '''
+    Hash of the files' content and the parse options. A RuleSet option
+    counts by the fields parsing depends on.
+    '''
+    ruleset = options.get('ruleset')
+    if ruleset is not None:
+        options['ruleset'] = [ruleset.site, ruleset.league,
+                              ruleset.game_type]
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        [VERSION, sorted(options.items())],
+        default=str,
+    ).encode())
+    for location in (salary_file_location, projection_file_location):
+        digest.update(b'\x00')
+        if location:
+            with open(location, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def write_entry(entry: str, players: list, kind: str = CLASSIC):
+    '''
+    Writes players to the directory entry. The entry appears at once
+    and is left alone if another process wrote it first.
+    '''
+    strings = _StringTable()
+    rows = []
+    row_codes = {}
+
+    def row_code(kv_store):
+        if not kv_store:
+            return -1
+        if id(kv_store) not in row_codes:
+            row_codes[id(kv_store)] = len(rows)
+            rows.append(kv_store)
+        return row_codes[id(kv_store)]
+
+    bases = players
+    slots = None
+    if kind == SHOWDOWN:
+        base_codes = {}
+        bases = []
+        slots = np.empty(len(players), dtype=SLOT_DTYPE)
+        for i, p in enumerate(players):
+            if id(p.base) not in base_codes:
+                base_codes[id(p.base)] = len(bases)
+                bases.append(p.base)
+            own_cost = p.cost != p.base.cost * p.cost_multiplier
+            slots[i] = (
+                base_codes[id(p.base)],
+                p.captain,
+                p.cost_multiplier,
+                p.cost if own_cost else np.nan,
+                -1 if p.kv_store is p.base.kv_store
+                else row_code(p.kv_store),
+            )
+
+    records = np.empty(len(bases), dtype=RECORD_DTYPE)
+    for i, p in enumerate(bases):
+        records[i] = tuple(
+            strings.code(getattr(p, f, None)) for f in STRING_FIELDS
+        ) + (
+            p.cost,
+            p.proj,
+            p.average_score,
+            p.multi_position,
+            row_code(p.kv_store),
+        )
+
+    header = list(rows[0]) if rows else []
+    cells = np.array(
+        [[strings.code(row[h]) for h in header] for row in rows],
+        dtype=np.int32,
+    ).reshape(len(rows), len(header))
+
+    os.makedirs(os.path.dirname(entry) or '.', exist_ok=True)
+    staging = tempfile.mkdtemp(dir=os.path.dirname(entry) or '.')
+    try:
+        with open(os.path.join(staging, 'meta.json'), 'w') as f:
+            json.dump({'version': VERSION, 'kind': kind,
+                       'header': header}, f)
+        np.save(os.path.join(staging, 'strings.npy'), strings.encoded())
+        np.save(os.path.join(staging, 'records.npy'), records)
+        np.save(os.path.join(staging, 'rows.npy'), cells)
+        if slots is not None:
+            np.save(os.path.join(staging, 'slots.npy'), slots)
+        os.rename(staging, entry)
+    except OSError:
+        if not os.path.isdir(entry):
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def read_entry(entry: str) -> list:
+    '''
+    Players stored in the directory entry by write_entry.
+    '''
+    return build_players(read_columns(entry))
+
+
+def read_columns(entry: str) -> dict:
+    '''
+    The columns of the directory entry, decoded to Python lists, from
+    which build_players creates players.
+    '''
+    with open(os.path.join(entry, 'meta.json')) as f:
+        meta = json.load(f)
+
+    def column(name):
+        return np.load(os.path.join(entry, name + '.npy'))
+
+    strings = bytes(column('strings')).decode().split(SEPARATOR) + [None]
+    records = column('records')
+    string_columns = [
+        [strings[c] for c in records[f].tolist()] for f in STRING_FIELDS
+    ]
+    numeric_columns = [
+        records[f].tolist()
+        for f in ('cost', 'proj', 'average_score', 'multi_position', 'row')
+    ]
+    kind = meta['kind']
+    return {
+        'kind': kind,
+        'header': meta['header'],
+        'rows': [
+            [strings[c] for c in row] for row in column('rows').tolist()
+        ],
+        'records': list(zip(*(string_columns + numeric_columns))),
+        'slots': column('slots').tolist() if kind == SHOWDOWN else None,
+    }
+
+
+def build_players(columns: dict) -> list:
+    '''
+    New players, and new kv_store rows, from read_columns output.
+    '''
+    header = columns['header']
+    rows = [dict(zip(header, row)) for row in columns['rows']]
+    rows.append(None)
+    pickem = columns['kind'] == PICKEM
+
+    bases = []
+    for (name, pos, team, matchup, possible_positions, tier, cost, proj,
+         average_score, multi_position, row) in columns['records']:
+        fields = dict(
+            pos=pos,
+            name=name,
+            cost=cost,
+            proj=proj,
+            average_score=average_score,
+            matchup=matchup,
+            team=team,
+            possible_positions=possible_positions,
+            multi_position=multi_position,
+            kv_store=rows[row] if row >= 0 else {},
+        )
+        bases.append(
+            TieredPlayer(tier=tier, **fields) if pickem
+            else Player(**fields)
+        )
+
+    if columns['slots'] is None:
+        return bases
+
+    players = []
+    for base, captain, cost_multiplier, cost, row in columns['slots']:
+        player = ShowdownPlayer(
+            bases[base],
+            captain=captain,
+            cost_multiplier=cost_multiplier,
+        )
+        if cost == cost:
+            player.cost = cost
+        if row >= 0:
+            player.kv_store = rows[row]
+        players.append(player)
+    return players
+
+
+class _StringTable(object):
+    def __init__(self):
+        self.codes = dict()
+
+    def code(self, value) -> int:
+        if value is None:
+            return -1
+        return self.codes.setdefault(value, len(self.codes))
+
+    def encoded(self) -> np.ndarray:
+        text = SEPARATOR.join(self.codes).encode()
+        return np.frombuffer(text, dtype=np.uint8)
+
+
+def _kind(ruleset) -> str:
+    if ruleset is not None and ruleset.game_type in (PICKEM, SHOWDOWN):
+        return ruleset.game_type
+    return CLASSIC
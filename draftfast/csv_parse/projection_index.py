@@ -0,0 +1,156 @@
+'''
+Joins players to projections by name.
+
+Names are matched exactly first, then after normalizing case,
+punctuation, accents and suffixes like Jr. or III, and, when asked for
+with min_similarity, by trigram similarity. Trigrams are indexed once
+per projection file, so a fuzzy lookup only scores the names sharing a
+trigram with the query.
+'''
+import collections
+import csv
+import re
+import unicodedata
+
+SUFFIXES = frozenset(('jr', 'sr', 'ii', 'iii', 'iv', 'v'))
+# suggested Dice coefficient of the trigram sets for a fuzzy match
+MIN_SIMILARITY = 0.8
+NORMALIZED = 'normalized'
+FUZZY = 'fuzzy'
+
+
+class ProjectionIndex(object):
+    '''
+    Projections by name, built once per projection file. lookup records
+    which names needed a normalized or fuzzy match and which had none;
+    see report. Fuzzy matching is off unless min_similarity is given,
+    e.g. MIN_SIMILARITY.
+    '''
+
+    def __init__(self, projections: dict, min_similarity: float = None):
+        self.projections = projections
+        self.min_similarity = min_similarity
+        self.matches = dict()
+        self.unmatched = []
+
+        # normalized name -> projection names, and trigram -> normalized
+        # names containing it
+        self.names = collections.defaultdict(list)
+        for name in projections:
+            self.names[normalize(name)].append(name)
+        self.trigrams = collections.defaultdict(list)
+        self.trigram_counts = dict()
+        for key in self.names:
+            trigrams = _trigrams(key)
+            self.trigram_counts[key] = len(trigrams)
+            for trigram in trigrams:
+                self.trigrams[trigram].append(key)
+
+    @classmethod
+    def from_csv(cls, location: str, encoding='utf-8', errors='replace',
+                 min_similarity: float = None):
+        '''
+        Index of a projection CSV with playername and points columns.
+        '''
+        projections = dict()
+        with open(location, 'r', encoding=encoding,
+                  errors=errors) as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader, [])
+            name_index = header.index('playername')
+            points_index = header.index('points')
+            for row in reader:
+                if row:
+                    projections[row[name_index].strip()] = \
+                        float(row[points_index])
+        return cls(projections, min_similarity)
+
+    def __len__(self):
+        return len(self.projections)
+
+    def lookup(self, name: str, team: str = None):
+        '''
+        Projection for a player, also trying names like 'Andrew Luck
+        IND', or None.
+        '''
+        queries = [name]
+        if team is not None:
+            queries.append('{} {}'.format(name, team.upper()))
+
+        for query in queries:
+            if query in self.projections:
+                return self.projections[query]
+
+        for match in (self._normalized, self._fuzzy):
+            for query in queries:
+                found = match(normalize(query))
+                if found is not None:
+                    self.matches[name] = found
+                    return self.projections[found[0]]
+
+        self.unmatched.append(name)
+        return None
+
+    def report(self) -> str:
+        '''
+        Names matched after normalizing or by similarity, and names
+        with no projection.
+        '''
+        lines = [
+            '{} -> {} ({})'.format(name, found, how)
+            for name, (found, how) in sorted(self.matches.items())
+        ]
+        lines += [
+            'No projection for {}'.format(name)
+            for name in sorted(set(self.unmatched))
+        ]
+        return '\n'.join(lines)
+
+    def _normalized(self, key):
+        names = self.names.get(key, ())
+        if len(names) == 1:
+            return names[0], NORMALIZED
+        return None
+
+    def _fuzzy(self, key):
+        if self.min_similarity is None or not key:
+            return None
+
+        trigrams = _trigrams(key)
+        shared = collections.Counter()
+        for trigram in trigrams:
+            shared.update(self.trigrams.get(trigram, ()))
+
+        best = None
+        best_score = 0
+        tied = False
+        for candidate, count in shared.items():
+            score = 2 * count / (len(trigrams) +
+                                 self.trigram_counts[candidate])
+            if score > best_score:
+                best, best_score, tied = candidate, score, False
+            elif score == best_score:
+                tied = True
+
+        if best is None or best_score < self.min_similarity or tied or \
+                len(self.names[best]) > 1:
+            return None
+        return self.names[best][0], FUZZY
+
+
+def normalize(name: str) -> str:
+    '''
+    Lowercase name without accents, punctuation or generational
+    suffixes, e.g. "D.J. Moore Jr." -> "dj moore" and
+    "Marvin Jones Jr. DET" -> "marvin jones det".
+    '''
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    name = re.sub(r"[.'`]", '', name.lower())
+    words = re.sub(r'[^a-z0-9]+', ' ', name).split()
+    return ' '.join(words[:1] + [w for w in words[1:] if w not in SUFFIXES])
+
+
+def _trigrams(key: str) -> set:
+    padded = '  {} '.format(key)
+    return set(padded[i:i + 3] for i in range(len(padded) - 2))
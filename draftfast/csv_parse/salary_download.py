@@ -1,6 +1,8 @@
 import csv
 from draftfast.orm import Player
 from draftfast.pickem.pickem_orm import TieredPlayer
+from draftfast.player_pool import PlayerPool
+from draftfast.csv_parse.projection_index import ProjectionIndex, FUZZY
 from draftfast.showdown.orm import ShowdownPlayer
 from draftfast.rules import DRAFT_KINGS, FAN_DUEL
 
@@ -36,95 +38,200 @@ def generate_players_from_csvs(
     encoding='utf-8',
     errors='replace',
     ruleset=None,
-) -> list:
-    players = []
-    projections = None
-    if projection_file_location:
-        projections = _generate_projection_dict(
+    raw_columns=True,
+    pool=False,
+    projection_index=None,
+    min_similarity=None,
+):
+    '''
+    Players from a DraftKings or FanDuel salary CSV. With raw_columns,
+    each player keeps its CSV row in kv_store. With pool, returns a
+    PlayerPool instead of a list.
+
+    Projections are joined by name through a ProjectionIndex, read from
+    projection_file_location or passed as projection_index to inspect
+    its report afterwards. Names without an exact or normalized match
+    get a projection of 0, unless min_similarity turns on fuzzy
+    matching. verbose prints every fuzzy match and missing projection.
+    '''
+    projections = projection_index
+    if projections is None and projection_file_location:
+        projections = ProjectionIndex.from_csv(
             projection_file_location,
             encoding,
             errors,
+            min_similarity=min_similarity,
         )
 
     with open(salary_file_location, 'r',
               encoding=encoding, errors=errors) as csv_file:
-        csv_data = csv.DictReader(csv_file)
-        pos_key = 'Position'
-        is_nhl = ruleset and ruleset.league == 'NHL'
-        is_showdown = ruleset and ruleset.game_type == 'showdown'
-        if is_nhl or is_showdown:
-            pos_key = 'Roster Position'
-
-        for row in csv_data:
-            if ruleset and ruleset.game_type == 'pickem':
-                player = TieredPlayer(
-                    cost=0,  # salary not applicable in pickem
-                    name=row['Name'],
-                    pos=row['Position'],
-                    team=row['TeamAbbrev'],
-                    matchup=row['Game Info'],
-                    average_score=float(row['AvgPointsPerGame']),
-                    tier=row['Roster Position'],
-                )
-                _set_projections(
-                    projections,
-                    player,
-                    verbose,
-                )
-                players.append(player)
-            elif is_showdown:
-                pos = row[pos_key]
-                player = generate_player(
-                    pos=row['Position'],
-                    row=row,
-                    game=game,
-                )
-                _set_projections(
-                    projections,
-                    player,
-                    verbose,
-                )
-                captain = pos == 'CPT'
-                players.append(
-                    ShowdownPlayer(
-                        player,
-                        captain=captain,
-                    )
-                )
-            else:
-                for pos in row[pos_key].split('/'):
-                    if is_nhl and pos == 'UTIL':
-                        continue
-                    player = generate_player(
-                        pos=pos,
-                        row=row,
-                        game=game,
-                    )
-                    _set_projections(
-                        projections,
-                        player,
-                        verbose,
-                    )
-
-                    players.append(player)
+        players = list(stream_players(
+            csv_file,
+            game,
+            projections=projections,
+            verbose=verbose,
+            ruleset=ruleset,
+            raw_columns=raw_columns,
+        ))
 
+    if pool:
+        return PlayerPool(players)
     return players
 
 
-# TODO - extract
-def _create_classic_player():
-    pass
+def stream_players(
+    lines,
+    game: str,
+    projections: dict = None,
+    verbose=False,
+    ruleset=None,
+    raw_columns=True,
+):
+    '''
+    Yields players from the lines of a salary CSV, one row at a time.
+    Column positions are looked up once from the header. projections
+    is a ProjectionIndex or a dict of projections by name.
+    '''
+    if projections is not None and \
+            not isinstance(projections, ProjectionIndex):
+        projections = ProjectionIndex(projections)
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    is_nhl = ruleset and ruleset.league == 'NHL'
+    is_showdown = ruleset and ruleset.game_type == 'showdown'
+    is_pickem = ruleset and ruleset.game_type == 'pickem'
+    pos_key = 'Roster Position' if is_nhl or is_showdown else 'Position'
+    columns = _column_indices(header, game, pos_key, is_pickem)
+    width = len(header)
+    showdown_bases = {}
+
+    for row in reader:
+        if len(row) != width:
+            # like DictReader: skip blank lines, pad short rows
+            if not row:
+                continue
+            row = row[:width] + [None] * (width - len(row))
+        kv_store = dict(zip(header, row)) if raw_columns else {}
+        # missing columns point here
+        row.append(None)
+
+        if is_pickem:
+            yield _create_tiered_player(row, columns, projections,
+                                        verbose)
+        elif is_showdown:
+            # CPT and FLEX rows of a player share one base record
+            key = (
+                row[columns['name']].strip(),
+                row[columns['team']] or row[columns['team_alt']],
+            )
+            base = showdown_bases.get(key)
+            if base is None:
+                base = _create_classic_player(
+                    row[columns['Position']],
+                    row,
+                    columns,
+                    kv_store,
+                )
+                _set_projections(projections, base, verbose)
+                showdown_bases[key] = base
+            yield _create_showdown_player(
+                base,
+                row[columns['Salary']],
+                kv_store,
+                captain=row[columns[pos_key]] == 'CPT',
+                raw_columns=raw_columns,
+            )
+        else:
+            for pos in row[columns[pos_key]].split('/'):
+                if is_nhl and pos == 'UTIL':
+                    continue
+                player = _create_classic_player(pos, row, columns,
+                                                kv_store)
+                _set_projections(projections, player, verbose)
+                yield player
+
+
+def _column_indices(header, game, pos_key, is_pickem=False) -> dict:
+    '''
+    Index of every column the players are built from. Optional columns
+    missing from the header map to len(header), the None appended to
+    each row.
+    '''
+    index = dict((name, i) for i, name in enumerate(header))
+    keys = GAME_KEY_MAP[game]
+    if is_pickem:
+        required = ['Name', 'Position', 'TeamAbbrev', 'Game Info',
+                    'AvgPointsPerGame', 'Roster Position']
+        optional = []
+    else:
+        required = [keys['name'], 'Salary', 'Position', pos_key]
+        optional = ['team', 'team_alt', 'game', 'game_alt', 'avg']
+
+    columns = {}
+    for name in required:
+        if name not in index:
+            raise KeyError(name)
+        columns[name] = index[name]
+    for key in optional:
+        columns[key] = index.get(keys[key], len(header))
+    if not is_pickem:
+        columns['name'] = columns[keys['name']]
+    return columns
 
 
-def _create_tiered_player():
-    pass
+def _create_classic_player(pos, row, columns, kv_store):
+    try:
+        avg = float(row[columns['avg']] or 0)
+    except ValueError:
+        avg = float(0)
+
+    positions = row[columns['Position']]
+    return Player(
+        pos,
+        row[columns['name']].strip(),
+        row[columns['Salary']],
+        possible_positions=positions,
+        multi_position='/' in positions,
+        team=row[columns['team']] or row[columns['team_alt']],
+        matchup=row[columns['game']] or row[columns['game_alt']],
+        average_score=avg,
+        kv_store=kv_store,
+    )
 
 
-def _create_showdown_player():
-    pass
+def _create_tiered_player(row, columns, projections, verbose):
+    player = TieredPlayer(
+        cost=0,  # salary not applicable in pickem
+        name=row[columns['Name']],
+        pos=row[columns['Position']],
+        team=row[columns['TeamAbbrev']],
+        matchup=row[columns['Game Info']],
+        average_score=float(row[columns['AvgPointsPerGame']]),
+        tier=row[columns['Roster Position']],
+    )
+    _set_projections(projections, player, verbose)
+    return player
 
 
-def generate_player(pos, row, game):
+def _create_showdown_player(base, salary, kv_store, captain,
+                            raw_columns=True):
+    player = ShowdownPlayer(base, captain=captain)
+    salary = float(salary)
+    if salary != base.cost:
+        multiplier = salary / base.cost if base.cost else 0
+        if base.cost * multiplier == salary:
+            player.cost_multiplier = multiplier
+        else:
+            player.cost = salary
+    if raw_columns and kv_store is not base.kv_store:
+        player.kv_store = kv_store
+    return player
+
+
+def generate_player(pos, row, game, raw_columns=True):
     '''
     Parses CSV row for DraftKings or FanDuel
     and returns a player. Note that DraftKings
@@ -152,40 +259,26 @@ def generate_player(pos, row, game):
         team=row.get(team_key) or row.get(team_alt_key),
         matchup=row.get(game_key) or row.get(game_alt_key),
         average_score=avg,
-        kv_store=row,
+        kv_store=row if raw_columns else {},
     )
 
     return player
 
 
-def _generate_projection_dict(projection_file_location: str,
-                              encoding: str,
-                              errors: str) -> dict:
-    projections = {}
-    with open(projection_file_location, 'r',
-              encoding=encoding, errors=errors) as csv_file:
-        csv_data = csv.DictReader(csv_file)
-        for row in csv_data:
-            name = row.get('playername').strip().rstrip()
-            projections[name] = float(row.get('points'))
-
-    return projections
-
-
 def _set_projections(projections, player, verbose):
     if projections:
-        proj = projections.get(player.name)
-
-        # try to find projection for e.g. 'Andrew Luck IND'
-        if proj is None and player.team is not None:
-            alt_name = '{} {}'.format(player.name, player.team.upper())
-            proj = projections.get(alt_name)
-
+        proj = projections.lookup(player.name, player.team)
         if proj is None:
             if verbose:
                 print('No projection for {}'.format(player.name))
             player.proj = 0
         else:
+            found = projections.matches.get(player.name)
+            if verbose and found and found[1] == FUZZY:
+                print('Fuzzy projection for {}: {}'.format(
+                    player.name,
+                    found[0],
+                ))
             player.proj = proj
     else:
         player.proj = player.average_score
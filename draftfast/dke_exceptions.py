@@ -18,6 +18,14 @@ class PlayerBanAndLockException(Exception):
     pass
 
 
+class UnsupportedSolverException(Exception):
+    pass
+
+
+class PortfolioExposureException(Exception):
+    pass
+
+
 MISSING_ERROR = """
 Got {} projections out of {} total players.
 
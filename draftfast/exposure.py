@@ -1,11 +1,127 @@
 import math
 import csv
 import random
-from collections import OrderedDict
+from collections import Counter, OrderedDict
 from terminaltables import AsciiTable
 import numpy as np
 
-# TODO encapsulate this into an object
+
+class ExposureTracker(object):
+    '''
+    Running lineup counts per player name, per team and per team stack
+    (the sorted names of at least min_stack_size players from one team
+    in a lineup). add only visits the new roster, so exposure bounds
+    can be checked after every lineup of a long run.
+    '''
+
+    def __init__(self, rosters=(), min_stack_size: int = 2):
+        self.min_stack_size = min_stack_size
+        self.lineups = 0
+        self.players = Counter()
+        self.teams = Counter()
+        self.stacks = Counter()
+        # last Player seen for each name, for the exposure table
+        self.records = dict()
+        for roster in rosters:
+            self.add(roster)
+
+    def add(self, roster):
+        self.lineups += 1
+        by_team = dict()
+        for p in roster.players:
+            self.players[p.name] += 1
+            self.records[p.name] = p
+            if p.team:
+                by_team.setdefault(p.team, set()).add(p.name)
+
+        for team, names in by_team.items():
+            self.teams[team] += 1
+            if len(names) >= self.min_stack_size:
+                self.stacks[tuple(sorted(names))] += 1
+
+    def exposure_args(self, exposure_bounds, n, use_random,
+                      random_seed) -> dict:
+        '''
+        Exposure locks and bans for the next lineup, as
+        get_exposure_args.
+        '''
+        if use_random:
+            return get_exposure_args_random(self.players, exposure_bounds,
+                                            n, random_seed)
+
+        return _exposure_args_deterministic(self.players, self.lineups,
+                                            exposure_bounds)
+
+    def diffs(self, bounds) -> dict:
+        '''
+        Lineups over or under each bound, as check_exposure.
+        '''
+        if not bounds:
+            return {}
+
+        exposure_diffs = {}
+        for bound in bounds:
+            name = bound['name']
+            exposure = self.players.get(name, 0)
+
+            if exposure > self.lineups * bound['max']:
+                exposure_diffs[name] = exposure - self.lineups * bound['max']
+            elif exposure < self.lineups * bound['min']:
+                exposure_diffs[name] = exposure - self.lineups * bound['min']
+
+        return exposure_diffs
+
+    def table(self, bounds) -> str:
+        '''
+        Lineups per player against their bounds, as get_exposure_table.
+        '''
+        exposures = OrderedDict(sorted(self.players.items(),
+                                       key=lambda t: t[1],
+                                       reverse=True))
+        bounds_by_name = dict()
+        for bound in bounds or []:
+            bounds_by_name[bound['name']] = bound
+
+        table_data = []
+        headers = [
+            'Position',
+            'Player',
+            'Team',
+            'Matchup',
+            'Salary',
+            'Projection',
+            '# Lineups',
+            'Min',
+            'Max'
+        ]
+        table_data.append(headers)
+
+        for name, num in exposures.items():
+            s_min = ''
+            s_max = ''
+
+            # TODO format min/max as a single string
+            bound = bounds_by_name.get(name)
+            if bound:
+                s_min = self.lineups * bound['min']
+                s_max = self.lineups * bound['max']
+                if num > s_max:
+                    s_max = '\x1b[0;31;40m{:0.2f}\x1b[0m'.format(s_max)
+                elif num < s_min:
+                    s_min = '\x1b[0;31;40m{:0.2f}\x1b[0m'.format(s_min)
+
+            table_data.append(
+                self.records[name].to_exposure_table_row(num, s_min, s_max)
+            )
+
+        table = AsciiTable(table_data)
+        table.justify_columns[4] = 'right'
+        table.justify_columns[5] = 'right'
+        table.justify_columns[6] = 'right'
+        table.justify_columns[7] = 'right'
+        table.justify_columns[8] = 'right'
+
+        return 'Roster Exposure:\n' + table.table
 
 
 def parse_exposure_file(file_location):
@@ -37,36 +153,37 @@ def parse_exposure_file(file_location):
 
 def get_exposure_args(existing_rosters, exposure_bounds, n, use_random,
                       random_seed) -> dict:
-    exposures = {}
-    for r in existing_rosters:
-        for p in r.players:
-            exposures[p.name] = exposures.get(p.name, 0) + 1
-
-    if use_random:
-        return get_exposure_args_random(exposures, exposure_bounds, n,
-                                        random_seed)
-
-    return get_exposure_args_deterministic(exposures, existing_rosters,
-                                           exposure_bounds)
+    return ExposureTracker(existing_rosters).exposure_args(
+        exposure_bounds,
+        n,
+        use_random,
+        random_seed,
+    )
 
 
 def get_exposure_args_deterministic(exposures, existing_rosters,
                                     exposure_bounds) -> dict:
+    return _exposure_args_deterministic(exposures, len(existing_rosters),
+                                        exposure_bounds)
+
+
+def _exposure_args_deterministic(exposures, lineups,
+                                 exposure_bounds) -> dict:
     banned = []
     locked = []
 
     for bound in exposure_bounds:
         name = bound['name']
 
-        total = float(len(existing_rosters) + 1)
+        total = float(lineups + 1)
         min_lines = bound['min'] * total
         max_lines = math.floor(bound['max'] * total)
-        lineups = exposures.get(name, 0)
+        lineups_with = exposures.get(name, 0)
 
-        if lineups < min_lines:
+        if lineups_with < min_lines:
             # TODO - downsize locked so solution is not impossible
             locked.append(name)
-        elif lineups >= max_lines:
+        elif lineups_with >= max_lines:
             banned.append(name)
 
     return {
@@ -95,108 +212,240 @@ def get_exposure_args_random(exposures, exposure_bounds, n,
     }
 
 
-# TODO split this up to return total exposures, exposure_diffs
-def check_exposure(rosters, bounds):
-    if not bounds:
-        return {}
-
-    exposures = {}
-    for r in rosters:
-        for p in r.players:
-            exposures[p.name] = exposures.get(p.name, 0) + 1
-
-    exposure_diffs = {}
+class LockScheduler(object):
+    '''
+    Plans the random exposure locks of every lineup of a run up front.
+    Each bounded name is locked in floor(max * n) lineups (at least
+    ceil(min * n)), spread over randomly chosen lineups with the fewest
+    locks. A lock only goes where the lineup's lock set passes cheap
+    necessary checks against the rule set: roster size, position
+    limits and the salary cap with the cheapest possible fill. Names
+    missing from the pool, or banned by the caller, are never locked.
+    Lineups ban the bounded names they do not lock.
+    '''
+
+    def __init__(self, players, rule_set, exposure_bounds, n,
+                 random_seed=None, locked=(), banned=()):
+        self.rule_set = rule_set
+        self.n = n
+        self.locked = [name for name in locked]
+        self.costs = dict()
+        self.positions = dict()
+        for p in players:
+            if p.name in self.costs:
+                self.costs[p.name] = min(self.costs[p.name], p.cost)
+            else:
+                self.costs[p.name] = p.cost
+            self.positions.setdefault(p.name, set()).add(p.pos)
+        # entry costs, cheapest first, for the salary fill
+        self.fill = sorted((p.cost, p.name) for p in players)
+        self.limits = dict(
+            (pos, (min_limit, max_limit))
+            for pos, min_limit, max_limit in rule_set.position_limits
+        )
+
+        self.quotas = dict()
+        for bound in exposure_bounds:
+            name = bound['name']
+            if name not in self.costs or name in banned or \
+                    name in self.locked:
+                continue
+            self.quotas[name] = max(
+                math.floor(bound['max'] * n + 1e-9),
+                math.ceil(bound['min'] * n - 1e-9),
+            )
+
+        self.plan = [[] for _ in range(n)]
+        self.shortfall = dict()
+        self._schedule(random.Random(random_seed))
+
+    def exposure_args(self, lineup: int) -> dict:
+        '''
+        Exposure locks and bans for the lineup-th lineup of the run, as
+        get_exposure_args. Bounded names are banned from every lineup
+        that does not lock them, so none exceeds its quota.
+        '''
+        locked = self.plan[lineup] if lineup < self.n else []
+        return {
+            'banned': [name for name in self.quotas if name not in locked],
+            'locked': list(locked),
+        }
+
+    def feasible(self, names) -> bool:
+        '''
+        Whether a lineup locking names, plus the caller's locks, passes
+        the roster size, position and salary checks. Passing does not
+        guarantee a lineup exists.
+        '''
+        names = self.locked + list(names)
+        roster_size = self.rule_set.roster_size
+        if len(names) > roster_size:
+            return False
+
+        salary = sum(self.costs.get(name, 0) for name in names)
+        open_slots = roster_size - len(names)
+        chosen = set(names)
+        for cost, name in self.fill:
+            if not open_slots:
+                break
+            if name not in chosen:
+                salary += cost
+                open_slots -= 1
+        if salary > self.rule_set.salary_max:
+            return False
+
+        return self._positions_fit(names)
+
+    def _schedule(self, rng):
+        names = list(self.quotas)
+        rng.shuffle(names)
+        names.sort(key=lambda name: self.quotas[name], reverse=True)
+
+        for name in names:
+            lineups = list(range(self.n))
+            rng.shuffle(lineups)
+            lineups.sort(key=lambda k: len(self.plan[k]))
+
+            quota = self.quotas[name]
+            for k in lineups:
+                if not quota:
+                    break
+                if self.feasible(self.plan[k] + [name]):
+                    self.plan[k].append(name)
+                    quota -= 1
+            if quota:
+                self.shortfall[name] = quota
+
+    def _positions_fit(self, names) -> bool:
+        '''
+        Whether names can take distinct roster spots within the
+        position maximums while leaving enough spots for the position
+        minimums.
+        '''
+        options = [
+            [pos for pos in self.positions.get(name, ())
+             if pos in self.limits]
+            for name in names
+        ]
+        # names without a limited position only take a roster spot
+        roster_size = self.rule_set.roster_size - options.count([])
+        options = sorted((o for o in options if o), key=len)
+        counts = dict((pos, 0) for pos in self.limits)
+
+        def place(i):
+            if i == len(options):
+                return True
+            for pos in options[i]:
+                if counts[pos] >= self.limits[pos][1]:
+                    continue
+                counts[pos] += 1
+                needed = sum(
+                    max(self.limits[p][0], c) for p, c in counts.items()
+                )
+                if needed <= roster_size and place(i + 1):
+                    return True
+                counts[pos] -= 1
+            return False
 
-    for bound in bounds:
-        name = bound['name']
-        exposure = exposures.get(name, 0)
+        return place(0)
 
-        if exposure > len(rosters) * bound['max']:
-            exposure_diffs[name] = exposure - len(rosters) * bound['max']
-        elif exposure < len(rosters) * bound['min']:
-            exposure_diffs[name] = exposure - len(rosters) * bound['min']
 
-    return exposure_diffs
+# TODO split this up to return total exposures, exposure_diffs
+def check_exposure(rosters, bounds):
+    return ExposureTracker(rosters).diffs(bounds)
 
 
 def get_exposure_table(rosters, bounds):
-    exposures = {}
-    players = {}
-    for r in rosters:
-        for p in r.players:
-            exposures[p.name] = exposures.get(p.name, 0) + 1
-            players[p.name] = p
-
-    exposures = OrderedDict(sorted(exposures.items(),
-                                   key=lambda t: t[1],
-                                   reverse=True))
-
-    table_data = []
-    headers = [
-        'Position',
-        'Player',
-        'Team',
-        'Matchup',
-        'Salary',
-        'Projection',
-        '# Lineups',
-        'Min',
-        'Max'
-    ]
-    table_data.append(headers)
-
-    for name, num in exposures.items():
-        s_min = ''
-        s_max = ''
-
-        # TODO format min/max as a single string
-        if bounds:
-            for bound in bounds:
-                if bound['name'] == name:
-                    s_min = len(rosters) * bound['min']
-                    s_max = len(rosters) * bound['max']
-                    if num > s_max:
-                        s_max = '\x1b[0;31;40m{:0.2f}\x1b[0m'.format(s_max)
-                    elif num < s_min:
-                        s_min = '\x1b[0;31;40m{:0.2f}\x1b[0m'.format(s_min)
-
+    return ExposureTracker(rosters).table(bounds)
+
+
+# labels of get_exposure_matrix rows and columns
+MATRIX_LEVELS = {
+    'player': lambda p: str(p.short_name),
+    'team': lambda p: str(p.team),
+    'position': lambda p: str(p.pos),
+}
+
+
+class LineupIncidence(object):
+    '''
+    A set of lineups as an R x P matrix counting the players of each
+    lineup per label, e.g. per player name. Co-exposure of every pair of
+    labels is one matrix product; group gives team or position views.
+    '''
+
+    def __init__(self, labels: list, matrix: np.ndarray):
+        self.labels = labels
+        self.matrix = matrix
+
+    @classmethod
+    def from_rosters(cls, rosters, key=lambda p: p.name,
+                     exclude=()) -> 'LineupIncidence':
+        '''
+        Incidence of rosters, labelling each player with key(player).
+        Labels are sorted.
+        '''
+        codes = dict()
+        entries = []
+        for r, roster in enumerate(rosters):
+            for p in roster.players:
+                if exclude and p in exclude:
                     continue
-
-        table_data.append(players[name].to_exposure_table_row(num,
-                                                              s_min,
-                                                              s_max))
-
-    table = AsciiTable(table_data)
-    table.justify_columns[4] = 'right'
-    table.justify_columns[5] = 'right'
-    table.justify_columns[6] = 'right'
-    table.justify_columns[7] = 'right'
-    table.justify_columns[8] = 'right'
-
-    return 'Roster Exposure:\n' + table.table
-
-
-def get_exposure_matrix(rosters, exclude=[]):
-    players = set()
-    for r in rosters:
-        for p in r.players:
-            if p in exclude:
-                continue
-            players.add(p)
-
-    sorted_names = sorted([str(p.short_name) for p in players])
-    player_matrix = np.zeros((len(players), len(players)), dtype=int)
-
-    for r in rosters:
-        for i, p1 in enumerate(sorted_names):
-            for j, p2 in enumerate(sorted_names):
-                if p1 in r and p2 in r:
-                    player_matrix[i, j] += 1
-
+                label = key(p)
+                entries.append((r, codes.setdefault(label, len(codes))))
+
+        labels = sorted(codes)
+        order = np.empty(len(codes), dtype=int)
+        order[[codes[label] for label in labels]] = np.arange(len(labels))
+        matrix = np.zeros((len(rosters), len(labels)), dtype=np.int32)
+        if entries:
+            rows, columns = np.array(entries, dtype=int).T
+            np.add.at(matrix, (rows, order[columns]), 1)
+        return cls(labels, matrix)
+
+    def group(self, key) -> 'LineupIncidence':
+        '''
+        Incidence of the groups key(label) maps labels to, e.g. teams.
+        '''
+        groups = sorted(set(key(label) for label in self.labels))
+        index = dict((g, i) for i, g in enumerate(groups))
+        members = np.zeros((len(self.labels), len(groups)), dtype=np.int32)
+        for i, label in enumerate(self.labels):
+            members[i, index[key(label)]] = 1
+        return LineupIncidence(groups, self.matrix @ members)
+
+    def exposure(self) -> np.ndarray:
+        '''
+        Lineups containing each label.
+        '''
+        return (self.matrix > 0).sum(axis=0)
+
+    def co_exposure(self) -> np.ndarray:
+        '''
+        Lineups containing both labels, for every pair of labels; the
+        diagonal is exposure.
+        '''
+        present = (self.matrix > 0).astype(np.float64)
+        return np.rint(present.T @ present).astype(int)
+
+
+def get_exposure_matrix(rosters, exclude=[], level='player'):
+    '''
+    Table of lineups containing each pair of players, or of teams or
+    positions with level='team' or 'position'.
+    '''
+    incidence = LineupIncidence.from_rosters(
+        rosters,
+        key=MATRIX_LEVELS[level],
+        exclude=exclude,
+    )
+
+    sorted_names = incidence.labels
+    player_matrix = incidence.co_exposure()
     rows = [[''] + sorted_names]
 
     for i, p in enumerate(sorted_names):
-        rows.append([p] + list(player_matrix[i, :]))
+        rows.append([p] + player_matrix[i, :].tolist())
 
     table = AsciiTable(rows)
     table.inner_row_border = True
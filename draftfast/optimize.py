@@ -1,14 +1,23 @@
+import heapq
 import random
-from copy import deepcopy
+import time
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
 from typing import List
 from draftfast import player_pool as pool
 from draftfast.orm import RosterSelect, Roster
 from draftfast.optimizer import Optimizer
-from draftfast.exposure import check_exposure, \
-    get_exposure_table, get_exposure_matrix, get_exposure_args
+from draftfast.portfolio import PortfolioOptimizer, candidate_players
+from draftfast.showdown.showdown_optimizer import ShowdownOptimizer
+from draftfast.exposure import ExposureTracker, LockScheduler, \
+    get_exposure_matrix
 from draftfast.rules import RuleSet
 from draftfast.settings import PlayerPoolSettings, OptimizerSettings
 from draftfast.lineup_constraints import LineupConstraints
+from draftfast.stats import SolveStats
+from draftfast.dke_exceptions import (InvalidBoundsException,
+                                      PlayerBanAndLockException,
+                                      PortfolioExposureException)
 
 
 def run(rule_set: RuleSet,
@@ -19,40 +28,51 @@ def run(rule_set: RuleSet,
         exposure_dict: dict = dict(),
         roster_gen: Roster = None,
         verbose=False) -> Roster:
+    pool_start = time.perf_counter()
     players = pool.filter_pool(
-        deepcopy(player_pool),
+        player_pool,
         player_settings,
     )
 
     if not isinstance(rule_set, RuleSet):
         raise Exception("RuleSet not defined. Please refer to the docs")
 
-    if rule_set.game_type == 'showdown':
-        if optimizer_settings.no_offense_against_defense:
-            print('WARNING:')
-            print('no_offense_against_defense setting ignored for showdown')
-            print('game types. Use no_defense_against_captain instead.')
-            print()
+    if optimizer_settings.prune_dominated:
+        players = pool.prune_dominated(
+            players,
+            rule_set=rule_set,
+            optimizer_settings=optimizer_settings,
+            lineup_constraints=constraints,
+            exposure_dict=exposure_dict,
+        )
 
-    optimizer = Optimizer(
+    _warn_showdown_settings(rule_set, optimizer_settings)
+
+    optimizer_class = Optimizer
+    if ShowdownOptimizer.supports(players, rule_set, optimizer_settings,
+                                  constraints):
+        optimizer_class = ShowdownOptimizer
+
+    model_start = time.perf_counter()
+    optimizer = optimizer_class(
         players=players,
         rule_set=rule_set,
         settings=optimizer_settings,
         lineup_constraints=constraints,
         exposure_dict=exposure_dict,
     )
+    setup_time = time.perf_counter() - model_start
 
-    variables = optimizer.variables
-
-    if optimizer.solve():
-        if roster_gen:
-            roster = roster_gen()
-        else:
-            roster = RosterSelect().roster_gen(rule_set.league)
+    solved = optimizer.solve()
+    stats = _report_stats(
+        optimizer,
+        pool_time=model_start - pool_start,
+        setup_time=setup_time,
+    )
 
-        for i, player in enumerate(players):
-            if variables[i].solution_value() == 1:
-                roster.add_player(player)
+    if solved:
+        roster = _build_roster(rule_set, optimizer, roster_gen)
+        roster.stats = stats
 
         if verbose:
             print('Optimal roster for: {}'.format(rule_set.league))
@@ -99,6 +119,7 @@ def run_multi(
     verbose=False,
     exposure_bounds: List[dict] = list(),
     exposure_random_seed=None,
+    max_workers: int = None,
 ) -> [List[Roster], list]:
 
     if not isinstance(rule_set, RuleSet):
@@ -107,45 +128,95 @@ def run_multi(
     # set the random seed globally for random lineup exposure
     random.seed(exposure_random_seed)
 
-    rosters = []
-    for _ in range(0, iterations):
-        exposure_dict = get_exposure_args(
-            existing_rosters=optimizer_settings.existing_rosters,
+    deadline = None
+    if optimizer_settings.total_time_limit is not None:
+        deadline = time.monotonic() + optimizer_settings.total_time_limit
+
+    lock_schedule = None
+    if exposure_random_seed and exposure_bounds and \
+            not optimizer_settings.portfolio:
+        lock_schedule = LockScheduler(
+            players=player_pool,
+            rule_set=rule_set,
             exposure_bounds=exposure_bounds,
             n=iterations,
-            use_random=bool(exposure_random_seed),
             random_seed=exposure_random_seed,
+            locked=[p.name for p in player_pool
+                    if p.lock or constraints.is_locked(p.name)],
+            banned=[p.name for p in player_pool
+                    if p.ban or constraints.is_banned(p.name)],
         )
+        if verbose:
+            for name, missing in lock_schedule.shortfall.items():
+                print('{} is locked in {} lineups fewer than planned'
+                      .format(name, missing))
 
-        roster = run(
+    if optimizer_settings.portfolio:
+        rosters = _run_portfolio(
+            iterations=iterations,
+            rule_set=rule_set,
+            player_pool=player_pool,
+            constraints=constraints,
+            player_settings=player_settings,
+            optimizer_settings=optimizer_settings,
+            verbose=verbose,
+            exposure_bounds=exposure_bounds,
+            deadline=deadline,
+        )
+    elif max_workers and max_workers > 1:
+        rosters = _run_multi_parallel(
+            iterations=iterations,
             rule_set=rule_set,
             player_pool=player_pool,
+            constraints=constraints,
+            player_settings=player_settings,
             optimizer_settings=optimizer_settings,
+            verbose=verbose,
+            exposure_bounds=exposure_bounds,
+            exposure_random_seed=exposure_random_seed,
+            max_workers=max_workers,
+            deadline=deadline,
+            lock_schedule=lock_schedule,
+        )
+    elif optimizer_settings.persistent_model:
+        rosters = _run_multi_persistent(
+            iterations=iterations,
+            rule_set=rule_set,
+            player_pool=player_pool,
+            constraints=constraints,
             player_settings=player_settings,
-            exposure_dict=exposure_dict,
+            optimizer_settings=optimizer_settings,
+            verbose=verbose,
+            exposure_bounds=exposure_bounds,
+            exposure_random_seed=exposure_random_seed,
+            deadline=deadline,
+            lock_schedule=lock_schedule,
+        )
+    else:
+        rosters = _run_multi_rebuild(
+            iterations=iterations,
+            rule_set=rule_set,
+            player_pool=player_pool,
             constraints=constraints,
+            player_settings=player_settings,
+            optimizer_settings=optimizer_settings,
             verbose=verbose,
+            exposure_bounds=exposure_bounds,
+            exposure_random_seed=exposure_random_seed,
+            deadline=deadline,
+            lock_schedule=lock_schedule,
         )
-        if roster:
-            optimizer_settings.existing_rosters += [roster]
-
-        if roster:
-            rosters.append(roster)
-        else:
-            break
-
-        # clear ban/lock to reset exposure between iterations
-        reset_player_ban_lock(player_pool)
 
     exposure_diffs = {}
 
     if rosters and verbose:
-        print(get_exposure_table(rosters, exposure_bounds))
+        exposures = ExposureTracker(rosters)
+        print(exposures.table(exposure_bounds))
         print()
         print(get_exposure_matrix(rosters))
         print()
 
-        exposure_diffs = check_exposure(rosters, exposure_bounds)
+        exposure_diffs = exposures.diffs(exposure_bounds)
         for n, d in exposure_diffs.items():
             if d < 0:
                 print('{} is UNDER exposure by {} lineups'.format(n, d))
@@ -156,6 +227,791 @@ def run_multi(
 
 
 def reset_player_ban_lock(player_pool):
+    '''
+    Clears ban and lock on every player. run_multi keeps lock and ban
+    state per solve and no longer calls this; it is kept for callers
+    that reuse a pool they locked or banned themselves.
+    '''
     for p in player_pool:
         p.ban = False
         p.lock = False
+
+
+def run_top_k(
+    k: int,
+    rule_set: RuleSet,
+    player_pool: list,
+    constraints: LineupConstraints = LineupConstraints(),
+    player_settings: PlayerPoolSettings = PlayerPoolSettings(),
+    optimizer_settings: OptimizerSettings = OptimizerSettings(),
+    verbose=False,
+) -> List[Roster]:
+    '''
+    Returns the k best distinct lineups, best first, from one optimizer
+    model using Lawler's k-best partitioning: once a lineup is taken,
+    its subspace is split into disjoint children by fixing its not yet
+    fixed players in order (keep the first j, drop the j-th), and each
+    child is solved by re-bounding variables on the same model. A child
+    can project no more than its parent, so it waits in the queue under
+    the parent's projection and is only solved if that could still
+    make the top k.
+
+    With OptimizerSettings.uniques each taken lineup also adds its
+    uniqueness cut to the model; queued solutions violating a cut added
+    after they were solved are re-solved before they can be taken, so
+    the result matches generating the lineups one at a time with
+    run_multi.
+    '''
+    if not isinstance(rule_set, RuleSet):
+        raise Exception("RuleSet not defined. Please refer to the docs")
+
+    pool_start = time.perf_counter()
+    players = pool.filter_pool(
+        player_pool,
+        player_settings,
+    )
+
+    _warn_showdown_settings(rule_set, optimizer_settings)
+
+    model_start = time.perf_counter()
+    optimizer = Optimizer(
+        players=players,
+        rule_set=rule_set,
+        settings=optimizer_settings,
+        lineup_constraints=constraints,
+        exposure_dict=dict(),
+    )
+    pool_time = model_start - pool_start
+    setup_time = time.perf_counter() - model_start
+    add_cuts = bool(optimizer_settings.uniques) and \
+        optimizer_settings.uniques > 1
+
+    # heap entries: (-objective, unsolved, tie breaker, fixings,
+    # selected, cuts, proven optimal, stats). A child is queued unsolved
+    # under its parent's objective, which bounds its own, and is only
+    # solved once it reaches the top; solved entries win ties.
+    queue = []
+    counter = 0
+
+    def push(fixings, bound=None):
+        nonlocal counter, pool_time, setup_time
+        if bound is not None:
+            heapq.heappush(queue, (
+                -bound, 1, counter, fixings, None, None, None, None,
+            ))
+            counter += 1
+            return
+
+        selected, stats = _solve_with_fixings(
+            optimizer,
+            fixings,
+            pool_time=pool_time,
+            setup_time=setup_time,
+        )
+        pool_time = setup_time = 0
+        if selected is not None:
+            objective = sum(optimizer.projections[i] for i in selected)
+            heapq.heappush(queue, (
+                -objective,
+                0,
+                counter,
+                fixings,
+                selected,
+                len(rosters),
+                optimizer.proven_optimal,
+                stats,
+            ))
+            counter += 1
+
+    rosters = []
+    taken_indices = []
+    max_repeats = _max_repeats(rule_set, optimizer_settings)
+    push(dict())
+    while queue and len(rosters) < k:
+        objective, _, _, fixings, selected, cuts, proven, stats = \
+            heapq.heappop(queue)
+
+        if selected is None or (add_cuts and any(
+            len(taken & set(selected)) > max_repeats
+            for taken in taken_indices[cuts:]
+        )):
+            # not solved yet, or violating a uniqueness cut added after
+            # it was solved; a solution meeting the new cuts stays best
+            push(fixings)
+            continue
+
+        roster = _build_roster(rule_set, optimizer, indices=selected)
+        roster.proven_optimal = proven
+        roster.stats = stats
+        if verbose:
+            print('Optimal roster for: {}'.format(rule_set.league))
+            print(roster)
+        rosters.append(roster)
+
+        if add_cuts:
+            optimizer.add_no_duplicate_lineup(roster)
+            taken_indices.append(set(selected))
+
+        free = [i for i in selected if i not in fixings]
+        for j, idx in enumerate(free):
+            child = dict(fixings)
+            for kept in free[:j]:
+                child[kept] = 1
+            child[idx] = 0
+            push(child, bound=-objective)
+
+    return rosters
+
+
+def _solve_with_fixings(optimizer: Optimizer, fixings: dict,
+                        pool_time: float,
+                        setup_time: float) -> (list, SolveStats):
+    for idx, value in fixings.items():
+        optimizer.variables[idx].SetBounds(value, value)
+
+    selected = None
+    if optimizer.solve():
+        selected = optimizer.selected_indices()
+    # before the bounds change invalidates the solution
+    stats = _report_stats(
+        optimizer,
+        pool_time=pool_time,
+        setup_time=setup_time,
+    )
+
+    for idx in fixings.keys():
+        optimizer.variables[idx].SetBounds(0, 1)
+
+    return selected, stats
+
+
+def _run_multi_rebuild(
+    iterations: int,
+    rule_set: RuleSet,
+    player_pool: list,
+    constraints: LineupConstraints,
+    player_settings: PlayerPoolSettings,
+    optimizer_settings: OptimizerSettings,
+    verbose: bool,
+    exposure_bounds: List[dict],
+    exposure_random_seed,
+    deadline: float = None,
+    lock_schedule: LockScheduler = None,
+) -> List[Roster]:
+    rosters = []
+    exposures = ExposureTracker(optimizer_settings.existing_rosters)
+    for _ in range(0, iterations):
+        iteration_settings = _budgeted_settings(optimizer_settings, deadline)
+        if iteration_settings is None:
+            _warn_budget_exhausted(rosters, verbose)
+            break
+
+        if lock_schedule is not None:
+            exposure_dict = lock_schedule.exposure_args(len(rosters))
+        else:
+            exposure_dict = exposures.exposure_args(
+                exposure_bounds=exposure_bounds,
+                n=iterations,
+                use_random=bool(exposure_random_seed),
+                random_seed=exposure_random_seed,
+            )
+
+        roster = run(
+            rule_set=rule_set,
+            player_pool=player_pool,
+            optimizer_settings=iteration_settings,
+            player_settings=player_settings,
+            exposure_dict=exposure_dict,
+            constraints=constraints,
+            verbose=verbose,
+        )
+        if roster:
+            optimizer_settings.existing_rosters += [roster]
+            exposures.add(roster)
+
+        if roster:
+            rosters.append(roster)
+        else:
+            break
+
+    return rosters
+
+
+def _run_multi_persistent(
+    iterations: int,
+    rule_set: RuleSet,
+    player_pool: list,
+    constraints: LineupConstraints,
+    player_settings: PlayerPoolSettings,
+    optimizer_settings: OptimizerSettings,
+    verbose: bool,
+    exposure_bounds: List[dict],
+    exposure_random_seed,
+    deadline: float = None,
+    lock_schedule: LockScheduler = None,
+) -> List[Roster]:
+    '''
+    Builds the model once for the slate. Each iteration only applies
+    exposure locks / bans as bounds and appends the uniqueness cut for
+    the roster it produced.
+
+    With PlayerPoolSettings.randomize, the randomized projections of
+    every lineup are drawn up front and each iteration only swaps the
+    objective coefficients. Pool filters then apply to the projections
+    before randomization.
+    '''
+    pool_start = time.perf_counter()
+    filter_settings = player_settings
+    if player_settings.randomize:
+        filter_settings = copy(player_settings)
+        filter_settings.randomize = None
+    players = pool.filter_pool(
+        player_pool,
+        filter_settings,
+    )
+
+    _warn_showdown_settings(rule_set, optimizer_settings)
+
+    model_start = time.perf_counter()
+    optimizer = Optimizer(
+        players=players,
+        rule_set=rule_set,
+        settings=optimizer_settings,
+        lineup_constraints=constraints,
+        exposure_dict=dict(),
+    )
+    draws = None
+    if player_settings.randomize:
+        draws = pool.projection_draws(
+            optimizer.projections,
+            player_settings.randomize,
+            iterations,
+        )
+    pool_time = model_start - pool_start
+    setup_time = time.perf_counter() - model_start
+
+    rosters = []
+    exposures = ExposureTracker(optimizer_settings.existing_rosters)
+    for n in range(0, iterations):
+        iteration_settings = _budgeted_settings(optimizer_settings, deadline)
+        if iteration_settings is None:
+            _warn_budget_exhausted(rosters, verbose)
+            break
+
+        if lock_schedule is not None:
+            exposure_dict = lock_schedule.exposure_args(n)
+        else:
+            exposure_dict = exposures.exposure_args(
+                exposure_bounds=exposure_bounds,
+                n=iterations,
+                use_random=bool(exposure_random_seed),
+                random_seed=exposure_random_seed,
+            )
+        optimizer.set_exposure(exposure_dict)
+        if draws is not None:
+            optimizer.set_projections(draws[n])
+
+        solved = optimizer.solve(time_limit=iteration_settings.time_limit)
+        stats = _report_stats(
+            optimizer,
+            pool_time=pool_time,
+            setup_time=setup_time,
+        )
+        pool_time = setup_time = 0
+
+        if not solved:
+            if verbose:
+                print('No solution found after {} lineups.'.format(
+                    len(rosters)
+                ))
+            break
+
+        roster = _build_roster(rule_set, optimizer)
+        roster.stats = stats
+        if verbose:
+            print('Optimal roster for: {}'.format(rule_set.league))
+            print(roster)
+
+        optimizer_settings.existing_rosters += [roster]
+        exposures.add(roster)
+        optimizer.add_no_duplicate_lineup(roster)
+        rosters.append(roster)
+
+    return rosters
+
+
+def _run_portfolio(
+    iterations: int,
+    rule_set: RuleSet,
+    player_pool: list,
+    constraints: LineupConstraints,
+    player_settings: PlayerPoolSettings,
+    optimizer_settings: OptimizerSettings,
+    verbose: bool,
+    exposure_bounds: List[dict],
+    deadline: float = None,
+) -> List[Roster]:
+    '''
+    Solves all lineups as one PortfolioOptimizer model, so exposure
+    bounds hold exactly instead of being steered lineup by lineup.
+
+    This is a heuristic: the pool is filtered (and randomized) once,
+    the lineups are generated one after another from it as run_multi
+    does without portfolio, and the portfolio is only optimal over
+    candidate_players, i.e. the players of those lineups plus the best
+    projected players of each position. Those lineups are returned when
+    no portfolio is found, or when a portfolio stopped on a limit
+    projects lower, as long as they meet the exposure bounds;
+    PortfolioExposureException is raised otherwise. Every portfolio
+    roster carries the stats of the single solve.
+    '''
+    if iterations < 1:
+        return []
+
+    pool_start = time.perf_counter()
+    players = pool.filter_pool(player_pool, player_settings)
+    pool_time = time.perf_counter() - pool_start
+
+    sequential_settings = copy(optimizer_settings)
+    sequential_settings.portfolio = False
+    sequential_settings.existing_rosters = list(
+        optimizer_settings.existing_rosters
+    )
+    sequential_settings.collect_stats = optimizer_settings.stats_enabled
+    sequential_settings.stats_callback = None
+    sequential = _run_multi_rebuild(
+        iterations=iterations,
+        rule_set=rule_set,
+        player_pool=players,
+        constraints=constraints,
+        # already filtered and randomized
+        player_settings=PlayerPoolSettings(),
+        optimizer_settings=sequential_settings,
+        verbose=False,
+        exposure_bounds=exposure_bounds,
+        exposure_random_seed=None,
+        deadline=deadline,
+    )
+
+    pool_start = time.perf_counter()
+    players = candidate_players(players, sequential, exposure_bounds)
+    pool_time += time.perf_counter() - pool_start
+
+    settings = _budgeted_settings(optimizer_settings, deadline)
+    if settings is None:
+        _warn_budget_exhausted(sequential, verbose)
+        return _accept_sequential(sequential, iterations, rule_set,
+                                  optimizer_settings, exposure_bounds,
+                                  verbose)
+
+    model_start = time.perf_counter()
+    optimizer = PortfolioOptimizer(
+        players=players,
+        rule_set=rule_set,
+        settings=settings,
+        lineup_constraints=constraints,
+        lineups=iterations,
+        exposure_bounds=exposure_bounds,
+    )
+    optimizer.set_hint(sequential)
+    setup_time = time.perf_counter() - model_start
+
+    solved = optimizer.solve()
+    stats = _report_stats(
+        optimizer,
+        pool_time=pool_time,
+        setup_time=setup_time,
+    )
+
+    if not solved:
+        if verbose:
+            print(
+                'No portfolio of {} lineups found, returning lineups '
+                'solved one after another.'.format(iterations)
+            )
+        return _accept_sequential(sequential, iterations, rule_set,
+                                  optimizer_settings, exposure_bounds,
+                                  verbose)
+
+    rosters = []
+    for lineup in range(iterations):
+        roster = _build_roster(
+            rule_set,
+            optimizer,
+            indices=optimizer.selected_indices(lineup),
+        )
+        roster.stats = stats
+        rosters.append(roster)
+
+    # a solver stopped on a limit may not reach the sequential lineups
+    if not optimizer.proven_optimal and \
+            len(sequential) == iterations and \
+            not ExposureTracker(sequential).diffs(exposure_bounds) and \
+            _total_projection(sequential) > _total_projection(rosters):
+        if verbose:
+            print(
+                'Lineups solved one after another project higher than '
+                'the portfolio found, returning them.'
+            )
+        return _accept_rosters(sequential, rule_set, optimizer_settings,
+                               verbose)
+
+    if verbose:
+        for roster in rosters:
+            print('Optimal roster for: {}'.format(rule_set.league))
+            print(roster)
+
+    optimizer_settings.existing_rosters += rosters
+    return rosters
+
+
+def _total_projection(rosters: List[Roster]) -> float:
+    return sum(roster.projected() for roster in rosters)
+
+
+def _accept_sequential(rosters: List[Roster], iterations: int,
+                       rule_set: RuleSet,
+                       optimizer_settings: OptimizerSettings,
+                       exposure_bounds: List[dict],
+                       verbose: bool) -> List[Roster]:
+    '''
+    Returns lineups solved one after another in place of a portfolio,
+    raising PortfolioExposureException when they miss the exposure
+    bounds the portfolio guarantees.
+    '''
+    exposure_diffs = ExposureTracker(rosters).diffs(exposure_bounds)
+    if exposure_diffs:
+        raise PortfolioExposureException(
+            'No portfolio of {} lineups found, and lineups solved one '
+            'after another miss the exposure bounds by {}'.format(
+                iterations,
+                exposure_diffs,
+            )
+        )
+    return _accept_rosters(rosters, rule_set, optimizer_settings, verbose)
+
+
+def _accept_rosters(rosters: List[Roster], rule_set: RuleSet,
+                    optimizer_settings: OptimizerSettings,
+                    verbose: bool) -> List[Roster]:
+    '''
+    Reports rosters solved with copied settings, as if solved with
+    optimizer_settings.
+    '''
+    for roster in rosters:
+        if verbose:
+            print('Optimal roster for: {}'.format(rule_set.league))
+            print(roster)
+        if optimizer_settings.stats_callback and roster.stats:
+            optimizer_settings.stats_callback(roster.stats)
+
+    optimizer_settings.existing_rosters += rosters
+    return rosters
+
+
+def _run_multi_parallel(
+    iterations: int,
+    rule_set: RuleSet,
+    player_pool: list,
+    constraints: LineupConstraints,
+    player_settings: PlayerPoolSettings,
+    optimizer_settings: OptimizerSettings,
+    verbose: bool,
+    exposure_bounds: List[dict],
+    exposure_random_seed,
+    max_workers: int,
+    deadline: float = None,
+    lock_schedule: LockScheduler = None,
+) -> List[Roster]:
+    '''
+    Fans lineup generation out over a process pool in rounds.
+
+    Each round splits the lineup space around the rosters accepted in
+    the previous round (pivots): subproblem k locks the first k players
+    of a pivot and bans its k-th player, so the subproblems of a pivot
+    are disjoint and none can return the pivot itself. Every subproblem
+    carries the uniqueness cuts and exposure locks/bans of all rosters
+    accepted so far. The parent accepts results best-first, re-checking
+    uniqueness and exposure against rosters accepted in the same round.
+    '''
+    use_random = bool(exposure_random_seed)
+    pool_names = set(p.name for p in player_pool)
+    rosters = []
+    pivots = []
+    exposures = ExposureTracker(optimizer_settings.existing_rosters)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_parallel_worker,
+        initargs=(rule_set, player_pool, constraints, player_settings),
+    ) as executor:
+        while len(rosters) < iterations:
+            iteration_settings = _budgeted_settings(
+                optimizer_settings,
+                deadline,
+            )
+            if iteration_settings is None:
+                _warn_budget_exhausted(rosters, verbose)
+                break
+
+            if lock_schedule is not None:
+                exposure_dict = lock_schedule.exposure_args(len(rosters))
+            else:
+                exposure_dict = exposures.exposure_args(
+                    exposure_bounds=exposure_bounds,
+                    n=iterations,
+                    use_random=use_random,
+                    random_seed=exposure_random_seed,
+                )
+
+            if not pivots:
+                roster = run(
+                    rule_set=rule_set,
+                    player_pool=player_pool,
+                    optimizer_settings=iteration_settings,
+                    player_settings=player_settings,
+                    exposure_dict=exposure_dict,
+                    constraints=constraints,
+                    verbose=verbose,
+                )
+                if not roster:
+                    break
+
+                optimizer_settings.existing_rosters += [roster]
+                exposures.add(roster)
+                rosters.append(roster)
+                pivots = [roster]
+                continue
+
+            round_settings = copy(iteration_settings)
+            round_settings.existing_rosters = list(
+                optimizer_settings.existing_rosters
+            )
+            # callbacks run in this process once a roster is accepted
+            round_settings.collect_stats = optimizer_settings.stats_enabled
+            round_settings.stats_callback = None
+            tasks = []
+            for k, pivot in enumerate(pivots):
+                if len(tasks) >= max_workers:
+                    break
+                # the pivots' subproblems aim at consecutive lineups
+                if lock_schedule is not None:
+                    exposure_dict = lock_schedule.exposure_args(
+                        len(rosters) + k
+                    )
+                for partition in _partition_exposure(pivot, exposure_dict):
+                    tasks.append((round_settings, partition))
+
+            candidates = [
+                r for r in executor.map(_solve_parallel_task, tasks) if r
+            ]
+            candidates.sort(key=lambda r: r.projected(), reverse=True)
+
+            pivots = []
+            for roster in candidates:
+                if len(rosters) >= iterations:
+                    break
+
+                if not _is_unique(roster, rosters, rule_set,
+                                  optimizer_settings):
+                    continue
+
+                if lock_schedule is not None:
+                    if not _respects_exposure(
+                        roster,
+                        lock_schedule.exposure_args(len(rosters)),
+                        pool_names,
+                    ):
+                        continue
+                elif not use_random:
+                    exposure_dict = exposures.exposure_args(
+                        exposure_bounds=exposure_bounds,
+                        n=iterations,
+                        use_random=False,
+                        random_seed=None,
+                    )
+                    if not _respects_exposure(roster, exposure_dict,
+                                              pool_names):
+                        continue
+
+                if verbose:
+                    print('Optimal roster for: {}'.format(rule_set.league))
+                    print(roster)
+
+                if optimizer_settings.stats_callback and roster.stats:
+                    optimizer_settings.stats_callback(roster.stats)
+
+                optimizer_settings.existing_rosters += [roster]
+                exposures.add(roster)
+                rosters.append(roster)
+                pivots.append(roster)
+
+    return rosters
+
+
+_parallel_worker_args = dict()
+
+
+def _init_parallel_worker(rule_set, player_pool, constraints,
+                          player_settings):
+    _parallel_worker_args.update(
+        rule_set=rule_set,
+        player_pool=player_pool,
+        constraints=constraints,
+        player_settings=player_settings,
+    )
+
+
+def _solve_parallel_task(task) -> Roster:
+    optimizer_settings, exposure_dict = task
+    try:
+        return run(
+            optimizer_settings=optimizer_settings,
+            exposure_dict=exposure_dict,
+            **_parallel_worker_args
+        )
+    except (PlayerBanAndLockException, InvalidBoundsException):
+        return None
+
+
+def _partition_exposure(roster: Roster, exposure_dict: dict) -> List[dict]:
+    '''
+    Exposure dicts splitting the lineup space around a roster into
+    disjoint subspaces that exclude the roster itself.
+    '''
+    names = [p.name for p in roster.sorted_players()]
+    banned = exposure_dict.get('banned', [])
+    locked = exposure_dict.get('locked', [])
+
+    partitions = []
+    for k, name in enumerate(names):
+        partition_locked = set(locked).union(names[:k])
+        partition_banned = set(banned).union([name])
+        if partition_locked & partition_banned:
+            continue
+
+        partitions.append({
+            'banned': list(partition_banned),
+            'locked': list(partition_locked),
+        })
+
+    return partitions
+
+
+def _max_repeats(rule_set: RuleSet,
+                 optimizer_settings: OptimizerSettings) -> int:
+    if optimizer_settings.uniques:
+        return max(rule_set.roster_size - optimizer_settings.uniques, 1)
+    return rule_set.roster_size - 1
+
+
+def _is_unique(roster: Roster, rosters: List[Roster], rule_set: RuleSet,
+               optimizer_settings: OptimizerSettings) -> bool:
+    max_repeats = _max_repeats(rule_set, optimizer_settings)
+    solver_ids = set(p.solver_id for p in roster.players)
+    for existing in rosters:
+        repeats = len(
+            solver_ids.intersection(p.solver_id for p in existing.players)
+        )
+        if repeats > max_repeats:
+            return False
+
+    return True
+
+
+def _respects_exposure(roster: Roster, exposure_dict: dict,
+                       pool_names: set) -> bool:
+    names = set(p.name for p in roster.players)
+    for name in exposure_dict.get('banned', []):
+        if name in names:
+            return False
+    for name in exposure_dict.get('locked', []):
+        if name in pool_names and name not in names:
+            return False
+
+    return True
+
+
+def _report_stats(optimizer: Optimizer, pool_time: float,
+                  setup_time: float) -> SolveStats:
+    '''
+    Collects SolveStats for the last solve when enabled in settings and
+    hands them to the stats callback. setup_time covers creating the
+    Optimizer and its variables, and is counted as build time.
+    '''
+    settings = optimizer.settings
+    if not settings.stats_enabled:
+        return None
+
+    stats = optimizer.get_stats(pool_time=pool_time)
+    stats.build_time += setup_time
+    if settings.stats_callback:
+        settings.stats_callback(stats)
+
+    return stats
+
+
+def _budgeted_settings(optimizer_settings: OptimizerSettings,
+                       deadline: float) -> OptimizerSettings:
+    '''
+    Settings for the next run_multi lineup, with the per lineup time
+    limit capped by what is left of the total budget. None once the
+    budget is spent.
+    '''
+    if deadline is None:
+        return optimizer_settings
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return None
+
+    time_limit = optimizer_settings.time_limit
+    if time_limit is not None and time_limit <= remaining:
+        return optimizer_settings
+
+    # existing_rosters stays shared with the caller's settings
+    budgeted_settings = copy(optimizer_settings)
+    budgeted_settings.time_limit = remaining
+    return budgeted_settings
+
+
+def _warn_budget_exhausted(rosters: List[Roster], verbose: bool):
+    if verbose:
+        print('Time limit reached after {} lineups.'.format(len(rosters)))
+
+
+def _build_roster(rule_set: RuleSet, optimizer: Optimizer,
+                  roster_gen: Roster = None,
+                  indices: List[int] = None) -> Roster:
+    if roster_gen:
+        roster = roster_gen()
+    else:
+        roster = RosterSelect().roster_gen(rule_set.league)
+
+    if indices is None:
+        indices = optimizer.selected_indices()
+
+    for i in indices:
+        player = optimizer.players[i]
+        proj = float(optimizer.projections[i])
+        locked = bool(optimizer.locked[i])
+        if proj != player.proj or locked != player.lock:
+            # pool players are shared; lock state and re-weighted
+            # projections (e.g. randomization) belong to this roster
+            player = copy(player)
+            player.proj = proj
+            player.lock = locked
+        roster.add_player(player)
+
+    roster.proven_optimal = optimizer.proven_optimal
+    return roster
+
+
+def _warn_showdown_settings(rule_set: RuleSet,
+                            optimizer_settings: OptimizerSettings):
+    if rule_set.game_type == 'showdown':
+        if optimizer_settings.no_offense_against_defense:
+            print('WARNING:')
+            print('no_offense_against_defense setting ignored for showdown')
+            print('game types. Use no_defense_against_captain instead.')
+            print()
@@ -1,11 +1,18 @@
+import re
+import time
 from typing import List
+import numpy as np
 from ortools.linear_solver import pywraplp
-from draftfast.settings import OptimizerSettings
+from draftfast.settings import OptimizerSettings, BIG_M
+from draftfast.solvers import create_solver
 from draftfast.dke_exceptions import (InvalidBoundsException,
                                       PlayerBanAndLockException)
-from draftfast.orm import Player
+from draftfast.orm import (Player, _nba_general_position,
+                           _mlb_general_position)
+from draftfast.player_pool import PlayerPool, _encode
 from draftfast.rules import RuleSet
 from draftfast.lineup_constraints import LineupConstraints
+from draftfast.stats import SolveStats
 
 
 class Optimizer(object):
@@ -17,13 +24,11 @@ class Optimizer(object):
         lineup_constraints: LineupConstraints,
         exposure_dict: dict
     ):
-        self.solver = pywraplp.Solver(
-            'FD',
-            pywraplp.Solver.CBC_MIXED_INTEGER_PROGRAMMING
-        )
+        if not isinstance(players, PlayerPool):
+            players = PlayerPool(players)
         self.players = players
         self.enumerated_players = list(enumerate(players))
-        self.existing_rosters = settings.existing_rosters or []
+        self.existing_rosters = list(settings.existing_rosters or [])
         self.salary_min = rule_set.salary_min
         self.salary_max = rule_set.salary_max
         self.roster_size = rule_set.roster_size
@@ -37,38 +42,127 @@ class Optimizer(object):
         self.lineup_constraints = lineup_constraints
         self.banned_for_exposure = exposure_dict.get('banned', [])
         self.locked_for_exposure = exposure_dict.get('locked', [])
+        self.built = False
+        self.exposure_constraints = dict()
+        self.status = None
+        # relative gap the last solve reached, None without a solution
+        self.reached_gap = None
+        self.last_build_time = 0
+        self.last_solve_time = 0
+        # appended to the names of auxiliary variables, which must be
+        # unique per solver
+        self.variable_suffix = ''
+        # with lazy uniqueness, prior rosters only become constraints
+        # once a solution repeats too many of their players
+        self.lazy_uniqueness = settings.lazy_uniqueness
+        self.roster_index = RosterIndex(len(players))
 
-        self.player_to_idx_map = {}
-        self.name_to_idx_map = {}
-        self.variables = []
         self.name_to_idx_map = dict()
         self.player_to_idx_map = dict()
 
         for idx, player in self.enumerated_players:
-            self.variables.append(
-                self.solver.IntVar(0, 1, player.solver_id)
-            )
-
             self._add_player_to_idx_maps(player, idx)
 
-            if self._is_locked(player):
-                player.lock = True
-            if self._is_banned(player):
-                player.ban = True
-            if self._is_position_locked(player):
-                player.position_lock = True
-            if self._is_position_banned(player):
-                player.position_ban = True
-
-            # TODO: this can only happen because of exposure, but it could be
-            # handled better
-            if player.lock and player.ban:
-                raise PlayerBanAndLockException(player.name)
-
-        self.teams = set([p.team for p in self.players])
+        # lock / ban state of this solve, by player index; the players
+        # themselves are shared with the caller and never modified
+        self.locked = players.lock | players.mask('name', self._is_locked)
+        self.banned = players.ban | players.mask('name', self._is_banned)
+        self.position_locked = players.position_lock | np.array(
+            [self._is_position_locked(p) for p in players],
+            dtype=bool,
+        )
+        self.position_banned = players.position_ban | np.array(
+            [self._is_position_banned(p) for p in players],
+            dtype=bool,
+        )
+
+        # TODO: this can only happen because of exposure, but it could be
+        # handled better
+        conflicts = np.flatnonzero(self.locked & self.banned)
+        if len(conflicts):
+            raise PlayerBanAndLockException(players[conflicts[0]].name)
+
+        self._set_player_columns()
+        self._create_model()
+
+    def _create_model(self):
+        '''
+        Creates the solver with one binary variable per player and a
+        maximized objective.
+        '''
+        self.solver = create_solver(
+            backend=self.settings.solver,
+            threads=self.settings.solver_threads,
+        )
+        self.variables = [
+            self.solver.IntVar(0, 1, player.solver_id)
+            for player in self.players
+        ]
         self.objective = self.solver.Objective()
         self.objective.SetMaximization()
 
+    def _set_player_columns(self):
+        '''
+        Column arrays and index maps over the pool, computed once so the
+        constraint builders only visit the players a constraint touches.
+        '''
+        players = self.players
+        self.costs = players.cost
+        self.projections = players.proj
+
+        self.team_labels, self.team_codes = players.encoded('team')
+        self.position_labels, self.position_codes = players.encoded('pos')
+        self.teams = set(self.team_labels)
+        self.team_to_idx_map = _group(self.team_labels, self.team_codes)
+        self.position_to_idx_map = _group(
+            self.position_labels,
+            self.position_codes,
+        )
+        self.opponent_to_idx_map = dict()
+        # players sharing a matchup and team share their opponents
+        matchup_labels, matchup_codes = players.encoded('matchup')
+        pairs = matchup_codes * len(self.team_labels) + self.team_codes
+        for idx in _group(*_encode(pairs.tolist())).values():
+            for team in _opponents(players[idx[0]], self.teams):
+                self.opponent_to_idx_map.setdefault(team, []).extend(
+                    idx.tolist()
+                )
+        for team, idx in self.opponent_to_idx_map.items():
+            self.opponent_to_idx_map[team] = np.sort(idx)
+        self.real_position_to_idx_map = _group(*players.encoded('real_pos'))
+
+        self.general_position_to_idx_map = dict()
+        for general_position in (
+            _nba_general_position,
+            _mlb_general_position,
+        ):
+            general_positions = _encode([
+                general_position(pos) for pos in self.position_labels
+            ])
+            # map each player's position code to its general position
+            labels = general_positions[0]
+            codes = general_positions[1][self.position_codes]
+            for label, idx in _group(labels, codes).items():
+                self.general_position_to_idx_map[label] = np.union1d(
+                    self.general_position_to_idx_map.get(
+                        label,
+                        np.array([], dtype=int),
+                    ),
+                    idx,
+                )
+
+    def _indices(self, idx_map: dict, keys) -> np.ndarray:
+        empty = np.array([], dtype=int)
+        indices = [idx_map.get(k, empty) for k in keys]
+        if not indices:
+            return empty
+        return np.concatenate(indices)
+
+    def _team_position_indices(self, team, positions) -> np.ndarray:
+        on_team = self.team_to_idx_map.get(team, np.array([], dtype=int))
+        in_positions = self._indices(self.position_to_idx_map, positions)
+        return np.intersect1d(on_team, in_positions)
+
     def _add_player_to_idx_maps(self, p: Player, idx: int):
         self.player_to_idx_map[p.solver_id] = idx
 
@@ -76,15 +170,13 @@ class Optimizer(object):
             self.name_to_idx_map[p.name] = set()
         self.name_to_idx_map[p.name].update([idx])
 
-    def _is_locked(self, p: Player) -> bool:
-        return self.lineup_constraints.is_locked(p.name) or \
-               p.name in self.locked_for_exposure or \
-               p.lock
+    def _is_locked(self, name: str) -> bool:
+        return self.lineup_constraints.is_locked(name) or \
+               name in self.locked_for_exposure
 
-    def _is_banned(self, p: Player) -> bool:
-        return self.lineup_constraints.is_banned(p.name) or \
-               p.name in self.banned_for_exposure or \
-               p.ban
+    def _is_banned(self, name: str) -> bool:
+        return self.lineup_constraints.is_banned(name) or \
+               name in self.banned_for_exposure
 
     def _is_position_locked(self, p: Player) -> bool:
         return self.lineup_constraints.is_position_locked(p.solver_id)
@@ -92,7 +184,116 @@ class Optimizer(object):
     def _is_position_banned(self, p: Player) -> bool:
         return self.lineup_constraints.is_position_banned(p.solver_id)
 
-    def solve(self) -> bool:
+    def solve(self, time_limit: float = None) -> bool:
+        '''
+        Solves the model, honoring the time limit (seconds) and relative
+        MIP gap from OptimizerSettings. time_limit overrides the per
+        lineup limit, e.g. to fit a run_multi budget. A feasible lineup
+        is accepted when the solver stops on a limit; check
+        proven_optimal to tell it apart from an optimal one.
+
+        With lazy uniqueness, a solution sharing too many players with
+        prior rosters gets their cuts and the model is solved again,
+        all within the time limit.
+        '''
+        self.last_build_time = 0
+        if not self.built:
+            start = time.perf_counter()
+            self.build()
+            self.last_build_time = time.perf_counter() - start
+
+        if time_limit is None:
+            time_limit = self.settings.time_limit
+        if time_limit is not None:
+            self.solver.SetTimeLimit(max(int(time_limit * 1000), 1))
+
+        parameters = pywraplp.MPSolverParameters()
+        if self.settings.mip_gap is not None:
+            parameters.SetDoubleParam(
+                pywraplp.MPSolverParameters.RELATIVE_MIP_GAP,
+                self.settings.mip_gap,
+            )
+
+        start = time.perf_counter()
+        self.status = self.solver.Solve(parameters)
+        while self.lazy_uniqueness and \
+                self.status in (self.solver.OPTIMAL, self.solver.FEASIBLE):
+            violated = self.roster_index.violated(
+                self.selected_indices(),
+                self._max_repeats(),
+            )
+            if not violated:
+                break
+            for indices in violated:
+                self._add_uniqueness_cut(indices)
+
+            if time_limit is not None:
+                remaining = time_limit - (time.perf_counter() - start)
+                if remaining <= 0:
+                    self.status = self.solver.NOT_SOLVED
+                    break
+                self.solver.SetTimeLimit(max(int(remaining * 1000), 1))
+            self.status = self.solver.Solve(parameters)
+        self.last_solve_time = time.perf_counter() - start
+
+        self.reached_gap = None
+        if self.status in (self.solver.OPTIMAL, self.solver.FEASIBLE):
+            value = self.objective.Value()
+            self.reached_gap = abs(self.objective.BestBound() - value) / \
+                max(abs(value), 1e-9)
+
+        if self.status == self.solver.OPTIMAL:
+            return True
+
+        return self.status == self.solver.FEASIBLE and (
+            time_limit is not None or self.settings.mip_gap is not None
+        )
+
+    @property
+    def proven_optimal(self) -> bool:
+        '''
+        Whether the last solve closed the gap to the solver's default
+        tolerance, whatever mip_gap allowed it to stop at.
+        '''
+        return self.status == self.solver.OPTIMAL and \
+            self.reached_gap is not None and \
+            self.reached_gap <= pywraplp.MPSolverParameters \
+            .kDefaultRelativeMipGap
+
+    def selected_indices(self) -> List[int]:
+        '''
+        Indices of the players in the last solution.
+        '''
+        return [
+            i for i, v in enumerate(self.variables)
+            if v.solution_value() > 0.5
+        ]
+
+    def get_stats(self, pool_time: float = 0) -> SolveStats:
+        '''
+        Statistics for the last call to solve.
+        '''
+        solved = self.status in (self.solver.OPTIMAL, self.solver.FEASIBLE)
+        return SolveStats(
+            pool_time=pool_time,
+            build_time=self.last_build_time,
+            solve_time=self.last_solve_time,
+            variables=self.solver.NumVariables(),
+            constraints=self.solver.NumConstraints(),
+            nodes=self.solver.nodes() if solved else None,
+            objective=self.objective.Value() if solved else None,
+            best_bound=self.objective.BestBound() if solved else None,
+            status=self.status,
+            proven_optimal=self.proven_optimal,
+            solver=self.settings.solver,
+        )
+
+    def build(self):
+        '''
+        Emits every constraint of the model. Called once; later solves
+        only re-run the solver, so callers re-using the model should
+        go through add_no_duplicate_lineup and set_exposure.
+        '''
         self._set_player_constraints()
         self._set_player_group_constraints()
         self._optimize_on_projected_points()
@@ -105,31 +306,86 @@ class Optimizer(object):
         self._set_no_duplicate_lineups()
         self._set_min_teams()
 
-        if self.offensive_positions and self.defensive_positions \
-                and self.settings.no_offense_against_defense or \
-                self.showdown and self.settings.no_defense_against_captain:
+        if self._has_no_opp_defense():
             self._set_no_opp_defense()
 
-        solution = self.solver.Solve()
-
-        return solution == self.solver.OPTIMAL
+        self.built = True
+
+    def add_no_duplicate_lineup(self, roster):
+        '''
+        Adds the uniqueness cut for a roster solved after the model
+        was built.
+        '''
+        self.existing_rosters.append(roster)
+        if self.built:
+            if self.lazy_uniqueness:
+                self.roster_index.add(self._roster_indices(roster))
+            else:
+                self._set_no_duplicate_lineup(roster)
+
+    def set_projections(self, projections):
+        '''
+        Replaces the objective coefficients, one projection per player,
+        without touching the constraints. Rosters built afterwards carry
+        the new projections.
+        '''
+        self.projections = np.asarray(projections, dtype=float)
+        for variable, proj in zip(self.variables,
+                                  self.projections.tolist()):
+            self.objective.SetCoefficient(variable, proj)
+
+    def set_exposure(self, exposure_dict: dict):
+        '''
+        Applies exposure locks and bans to a built model through one
+        bounded constraint per player name, relaxing the bounds of names
+        no longer locked or banned.
+        '''
+        locked = set(exposure_dict.get('locked', []))
+        banned = set(exposure_dict.get('banned', []))
+
+        for name in locked | banned | set(self.exposure_constraints):
+            if name not in self.name_to_idx_map:
+                continue
+
+            if name not in self.exposure_constraints:
+                constraint = self.solver.Constraint(
+                    0,
+                    self.solver.infinity(),
+                )
+                for idx in self.name_to_idx_map[name]:
+                    constraint.SetCoefficient(self.variables[idx], 1)
+                self.exposure_constraints[name] = constraint
+
+            constraint = self.exposure_constraints[name]
+            if name in locked:
+                if self.lineup_constraints.is_banned(name) or any(
+                    self.banned[i] for i in self.name_to_idx_map[name]
+                ):
+                    raise PlayerBanAndLockException(name)
+                constraint.SetBounds(1, self.solver.infinity())
+            elif name in banned:
+                constraint.SetBounds(0, 0)
+            else:
+                constraint.SetBounds(0, self.solver.infinity())
 
     def _set_player_constraints(self):
         multi_constraints = dict()
 
         for i, p in self.enumerated_players:
-            lb = 1 if (p.lock or p.position_lock) else 0
-            ub = 0 if (p.ban or p.position_ban) else 1
+            position_lock = self.position_locked[i]
+            position_ban = self.position_banned[i]
+            lb = 1 if (self.locked[i] or position_lock) else 0
+            ub = 0 if (self.banned[i] or position_ban) else 1
 
             if lb > ub:
                 raise InvalidBoundsException
 
             if (p.multi_position or self.showdown) and not (
-                    p.position_lock or p.position_ban):
+                    position_lock or position_ban):
                 if p.name not in multi_constraints.keys():
                     multi_constraints[p.name] = self.solver.Constraint(lb, ub)
                 constraint = multi_constraints[p.name]
-            elif (p.multi_position or self.showdown) and p.position_lock:
+            elif (p.multi_position or self.showdown) and position_lock:
                 if p.name not in multi_constraints.keys():
                     multi_constraints[p.name] = self.solver.Constraint(0, ub)
                 multi_constraints[p.name].SetCoefficient(self.variables[i], 1)
@@ -154,22 +410,16 @@ class Optimizer(object):
                     constraint.SetCoefficient(self.variables[idx], 1)
 
     def _optimize_on_projected_points(self):
-        for i, player in self.enumerated_players:
-            self.objective.SetCoefficient(
-                self.variables[i],
-                player.proj,
-            )
+        for i, proj in enumerate(self.projections.tolist()):
+            self.objective.SetCoefficient(self.variables[i], proj)
 
     def _set_salary_range(self):
         salary_cap = self.solver.Constraint(
             self.salary_min,
             self.salary_max,
         )
-        for i, player in self.enumerated_players:
-            salary_cap.SetCoefficient(
-                self.variables[i],
-                player.cost
-            )
+        for i, cost in enumerate(self.costs.tolist()):
+            salary_cap.SetCoefficient(self.variables[i], cost)
 
     def _set_roster_size(self):
         size_cap = self.solver.Constraint(
@@ -196,12 +446,8 @@ class Optimizer(object):
                         stack_count,
                     )
 
-                    for i, player in self.enumerated_players:
-                        if stack_team == player.team:
-                            stack_cap.SetCoefficient(
-                                self.variables[i],
-                                1
-                            )
+                    for i in self.team_to_idx_map.get(stack_team, []):
+                        stack_cap.SetCoefficient(self.variables[i], 1)
 
                     self._set_stacking_type(
                         stack_lock_pos,
@@ -219,15 +465,15 @@ class Optimizer(object):
     ):
         if self.settings:
             if stack_lock_pos and stack_eligible_pos:
-                enumerated_players = self.enumerated_players
-
                 skillplayers_on_team = [
-                    self.variables[i] for i, p in enumerated_players
-                    if p.team == team and p.pos in stack_eligible_pos
+                    self.variables[i] for i in
+                    self._team_position_indices(team, stack_eligible_pos)
                 ]
+                if isinstance(stack_lock_pos, str):
+                    stack_lock_pos = [stack_lock_pos]
                 locked_on_team = [
-                    self.variables[i] for i, p in enumerated_players
-                    if p.team == team and p.pos == stack_lock_pos
+                    self.variables[i] for i in
+                    self._team_position_indices(team, stack_lock_pos)
                 ]
                 self.solver.Add(
                     self.solver.Sum(skillplayers_on_team) >=
@@ -248,47 +494,89 @@ class Optimizer(object):
                 combo_skill_type.append('TE')
 
             if combo:
-                teams = set([p.team for p in self.players])
-                enumerated_players = self.enumerated_players
-
-                for team in teams:
+                for team in self.teams:
                     skillplayers_on_team = [
-                        self.variables[i] for i, p in enumerated_players
-                        if p.team == team and p.pos in combo_skill_type
+                        self.variables[i] for i in
+                        self._team_position_indices(team, combo_skill_type)
                     ]
                     qbs_on_team = [
-                        self.variables[i] for i, p in enumerated_players
-                        if p.team == team and p.pos == 'QB'
+                        self.variables[i] for i in
+                        self._team_position_indices(team, ['QB'])
                     ]
                     self.solver.Add(
                         self.solver.Sum(skillplayers_on_team) >=
                         self.solver.Sum(qbs_on_team)
                     )
 
-    def _set_no_opp_defense(self):
-        offensive_pos = self.offensive_positions
-        defensive_pos = self.defensive_positions
+    def _has_no_opp_defense(self) -> bool:
+        return bool(
+            self.offensive_positions and self.defensive_positions
+            and self.settings.no_offense_against_defense or
+            self.showdown and self.settings.no_defense_against_captain
+        )
 
-        enumerated_players = self.enumerated_players
+    def _no_opp_defense_indices(self):
+        '''
+        Yields, per team, the offensive players facing it and the
+        defenses none of them may be rostered with.
+        '''
+        offensive_pos = self.offensive_positions or []
+        defensive_pos = self.defensive_positions or []
+
+        offensive_idx = self._indices(self.position_to_idx_map, offensive_pos)
+        showdown_defensive_idx = np.array([], dtype=int)
+        if self.showdown:
+            showdown_defensive_idx = self._indices(
+                self.real_position_to_idx_map,
+                defensive_pos,
+            )
 
         for team in self.teams:
-            offensive_against = [
-                self.variables[i] for i, p in enumerated_players
-                if p.pos in offensive_pos and
-                p.is_opposing_team_in_match_up(team)
-            ]
+            offensive_against = np.intersect1d(
+                offensive_idx,
+                self.opponent_to_idx_map.get(team, []),
+            )
 
             # TODO this is gross for showdown
-            defensive = [
-                self.variables[i] for i, p in enumerated_players
-                if p.team == team and p.pos in defensive_pos or
-                self.showdown and p.real_pos in defensive_pos
-            ]
+            defensive = np.union1d(
+                self._team_position_indices(team, defensive_pos),
+                showdown_defensive_idx,
+            )
+
+            yield offensive_against, defensive
+
+    def _set_no_opp_defense(self):
+        for offensive_idx, defensive_idx in self._no_opp_defense_indices():
+            offensive_against = [self.variables[i] for i in offensive_idx]
+            defensive = [self.variables[i] for i in defensive_idx]
+
+            if self.settings.no_opp_defense_formulation == BIG_M:
+                self._set_no_opp_defense_big_m(offensive_against, defensive)
+                continue
 
             for p in offensive_against:
                 for d in defensive:
                     self.solver.Add(p <= 1 - d)
 
+    def _set_no_opp_defense_big_m(self, offensive_against, defensive):
+        '''
+        One constraint per defense instead of one per (offense, defense)
+        pair: sum(opposing offense) <= M * (1 - d). At most roster_size
+        players are selected, which bounds M.
+        '''
+        if not offensive_against:
+            return
+
+        big_m = min(len(offensive_against), self.roster_size)
+        for d in defensive:
+            constraint = self.solver.Constraint(
+                -self.solver.infinity(),
+                big_m,
+            )
+            for p in offensive_against:
+                constraint.SetCoefficient(p, 1)
+            constraint.SetCoefficient(d, big_m)
+
     def _set_positions(self):
         for position, min_limit, max_limit in self.position_limits:
             position_cap = self.solver.Constraint(
@@ -296,43 +584,60 @@ class Optimizer(object):
                 max_limit
             )
 
-            for i, player in self.enumerated_players:
-                if position == player.pos:
-                    position_cap.SetCoefficient(self.variables[i], 1)
+            for i in self.position_to_idx_map.get(position, []):
+                position_cap.SetCoefficient(self.variables[i], 1)
 
     def _set_general_positions(self):
         for general_position, min_limit, max_limit in \
                 self.general_position_limits:
             position_cap = self.solver.Constraint(min_limit, max_limit)
 
-            for i, player in self.enumerated_players:
-                if general_position == player.mlb_general_position:
-                    position_cap.SetCoefficient(
-                        self.variables[i],
-                        1
-                    )
-                if general_position == player.nba_general_position:
-                    position_cap.SetCoefficient(
-                        self.variables[i],
-                        1
-                    )
+            for i in self.general_position_to_idx_map.get(
+                general_position,
+                [],
+            ):
+                position_cap.SetCoefficient(self.variables[i], 1)
 
     def _set_no_duplicate_lineups(self):
-        for roster in self.existing_rosters:
-            max_repeats = self.roster_size - 1
-            if self.settings.uniques:
-                max_repeats = max(
-                    self.roster_size - self.settings.uniques,
-                    1
-                )
-            repeated_players = self.solver.Constraint(
-                0,
-                max_repeats
+        if self.lazy_uniqueness:
+            self.roster_index.extend(
+                self._roster_indices(roster)
+                for roster in self.existing_rosters
             )
-            for player in roster.sorted_players():
-                i = self.player_to_idx_map.get(player.solver_id)
-                if i is not None:
-                    repeated_players.SetCoefficient(self.variables[i], 1)
+            return
+
+        for roster in self.existing_rosters:
+            self._set_no_duplicate_lineup(roster)
+
+    def _max_repeats(self) -> int:
+        '''
+        Players a lineup may share with each existing roster.
+        '''
+        if self.settings.uniques:
+            return max(self.roster_size - self.settings.uniques, 1)
+        return self.roster_size - 1
+
+    def _set_no_duplicate_lineup(self, roster):
+        self._add_uniqueness_cut(self._roster_indices(roster))
+
+    def _roster_indices(self, roster) -> List[int]:
+        '''
+        Indices of a roster's players in the pool.
+        '''
+        indices = []
+        for player in roster.players:
+            i = self.player_to_idx_map.get(player.solver_id)
+            if i is not None:
+                indices.append(i)
+        return indices
+
+    def _add_uniqueness_cut(self, indices):
+        repeated_players = self.solver.Constraint(
+            0,
+            self._max_repeats(),
+        )
+        for i in indices:
+            repeated_players.SetCoefficient(self.variables[i], 1)
 
     def _set_min_teams(self):
         teams = []
@@ -340,11 +645,14 @@ class Optimizer(object):
         if self.settings.min_teams > 1:
             for team in self.teams:
                 if team:
-                    team_var = self.solver.IntVar(0, 1, team)
+                    team_var = self.solver.IntVar(
+                        0,
+                        1,
+                        team + self.variable_suffix,
+                    )
                     teams.append(team_var)
                     players_on_team = [
-                        self.variables[i] for i, p
-                        in self.enumerated_players if p.team == team
+                        self.variables[i] for i in self.team_to_idx_map[team]
                     ]
                     self.solver.Add(
                         team_var <=
@@ -359,3 +667,95 @@ class Optimizer(object):
             self.solver.Add(
                 self.solver.Sum(teams) >= self.settings.min_teams
             )
+
+
+class RosterIndex(object):
+    '''
+    Rosters as rows of a bitset over player indices, so the overlap of
+    a lineup with every roster is one vectorized AND and popcount.
+    '''
+
+    def __init__(self, players: int):
+        self.bits = np.zeros((16, (players + 7) // 8), dtype=np.uint8)
+        self.players = players
+        self.size = 0
+        # player indices of each row
+        self.indices = []
+
+    def __len__(self):
+        return self.size
+
+    def add(self, indices):
+        self.extend([indices])
+
+    def extend(self, rosters):
+        '''
+        Adds the player indices of several rosters at once.
+        '''
+        rosters = [list(indices) for indices in rosters]
+        if not rosters:
+            return
+
+        capacity = len(self.bits)
+        while capacity < self.size + len(rosters):
+            capacity *= 2
+        if capacity > len(self.bits):
+            bits = np.zeros((capacity, self.bits.shape[1]), dtype=np.uint8)
+            bits[:self.size] = self.bits[:self.size]
+            self.bits = bits
+
+        rows = np.zeros((len(rosters), self.players), dtype=np.uint8)
+        for r, indices in enumerate(rosters):
+            rows[r, indices] = 1
+        self.bits[self.size:self.size + len(rosters)] = \
+            np.packbits(rows, axis=1)
+        self.indices.extend(rosters)
+        self.size += len(rosters)
+
+    def overlaps(self, indices) -> np.ndarray:
+        '''
+        Players each roster shares with the lineup of indices.
+        '''
+        shared = self.bits[:self.size] & self._pack(indices)
+        return _POPCOUNT[shared].sum(axis=1)
+
+    def violated(self, indices, max_repeats: int) -> List[List[int]]:
+        '''
+        Rosters sharing more than max_repeats players with the lineup.
+        '''
+        if not self.size:
+            return []
+        rows = np.flatnonzero(self.overlaps(indices) > max_repeats)
+        return [self.indices[r] for r in rows.tolist()]
+
+    def _pack(self, indices) -> np.ndarray:
+        row = np.zeros(self.players, dtype=np.uint8)
+        row[list(indices)] = 1
+        return np.packbits(row)
+
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int32)
+
+
+def _group(labels: list, codes: np.ndarray) -> dict:
+    """
+    Maps each label to the sorted player indices carrying its code.
+    """
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+    return {
+        label: order[bounds[code]:bounds[code + 1]]
+        for code, label in enumerate(labels)
+    }
+
+
+def _opponents(player: Player, teams: set) -> set:
+    """
+    Teams named in a player's matchup (e.g. "NE@KC 08:30PM ET" or
+    "CEL vs LGN") other than the player's own.
+    """
+    if not player.matchup or not player.team:
+        return set()
+
+    tokens = set(re.split(r'[^A-Z0-9]+', player.matchup.upper()))
+    return (tokens & teams) - {player.team}
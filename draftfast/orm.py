@@ -1,4 +1,5 @@
 import locale
+import sys
 from terminaltables import AsciiTable
 from functools import total_ordering
 import re
@@ -17,6 +18,8 @@ class Roster:
     def __init__(self):
         self.players = []
         self.cached_id = None
+        self.proven_optimal = True
+        self.stats = None
 
     def __repr__(self):
         table_data = []
@@ -42,6 +45,8 @@ class Roster:
         aggregate_info = '\n\nProjected Score: {:0.2f} \t Cost: ${}'.format(
             self.projected(),
             cs(self.spent()))
+        if not self.proven_optimal:
+            aggregate_info += ' \t (not proven optimal)'
 
         return table.table + aggregate_info
 
@@ -234,8 +239,40 @@ class RosterSelect:
         return roster_dict[league]
 
 
+# repeated across a slate, so one copy of each string is shared
+INTERNED_FIELDS = frozenset(('pos', 'team', 'matchup', 'possible_positions'))
+# fields the cached keys below are derived from
+KEY_FIELDS = frozenset(('name', 'pos', 'team'))
+CACHED_KEYS = (
+    '_solver_id',
+    '_short_name',
+    '_nba_general_position',
+    '_mlb_general_position',
+)
+
+
 @total_ordering
 class Player(object):
+    __slots__ = (
+        'pos',
+        'name',
+        'cost',
+        'team',
+        'matchup',
+        'proj',
+        'average_score',
+        'projected_ownership_pct',
+        'lineup_count',
+        'marked',
+        'lock',
+        'position_lock',
+        'ban',
+        'position_ban',
+        'multi_position',
+        'possible_positions',
+        'kv_store',
+    ) + CACHED_KEYS
+
     def __init__(
         self,
         pos,
@@ -255,23 +292,38 @@ class Player(object):
         multi_position=False,
         kv_store={},
     ):
-        self.pos = pos
-        self.name = name
-        self.cost = float(cost)
-        self.team = team.upper() if team else team
-        self.matchup = matchup
-        self.proj = proj
-        self.average_score = average_score
-        self.projected_ownership_pct = projected_ownership_pct
-        self.lineup_count = lineup_count
-        self.marked = marked
-        self.lock = lock
-        self.position_lock = position_lock
-        self.ban = ban
-        self.position_ban = False
-        self.multi_position = multi_position
-        self.possible_positions = possible_positions
-        self.kv_store = kv_store
+        # assigned directly rather than through __setattr__, which only
+        # needs to run for later changes
+        set_field = object.__setattr__
+        for cached in CACHED_KEYS:
+            set_field(self, cached, None)
+        set_field(self, 'pos', _intern(pos))
+        set_field(self, 'name', name)
+        set_field(self, 'cost', float(cost))
+        set_field(self, 'team', _intern(team.upper() if team else team))
+        set_field(self, 'matchup', _intern(matchup))
+        set_field(self, 'proj', proj)
+        set_field(self, 'average_score', average_score)
+        set_field(self, 'projected_ownership_pct', projected_ownership_pct)
+        set_field(self, 'lineup_count', lineup_count)
+        set_field(self, 'marked', marked)
+        set_field(self, 'lock', lock)
+        set_field(self, 'position_lock', position_lock)
+        set_field(self, 'ban', ban)
+        set_field(self, 'position_ban', False)
+        set_field(self, 'multi_position', multi_position)
+        set_field(self, 'possible_positions', _intern(possible_positions))
+        # raw CSV row, if kept
+        set_field(self, 'kv_store', kv_store)
+
+    def __setattr__(self, key, value):
+        if key in INTERNED_FIELDS:
+            value = _intern(value)
+        object.__setattr__(self, key, value)
+
+        if key in KEY_FIELDS:
+            for cached in CACHED_KEYS:
+                object.__setattr__(self, cached, None)
 
     def get_player_id(self, player_map):
         return player_map[self.name + ' ' + self.possible_positions]
@@ -342,7 +394,13 @@ class Player(object):
 
     @property
     def solver_id(self):
-        return '{} {} {}'.format(self.name, self.pos, self.team)
+        if self._solver_id is None:
+            self._solver_id = '{} {} {}'.format(
+                self.name,
+                self.pos,
+                self.team,
+            )
+        return self._solver_id
 
     @property
     def formatted_position(self):
@@ -361,37 +419,21 @@ class Player(object):
 
     @property
     def nba_general_position(self):
-        if self.pos == 'SG' or self.pos == 'PG' or self.pos == 'G':
-            return 'G'
-        elif self.pos == 'SF' or self.pos == 'PF' or self.pos == 'F':
-            return 'F'
-        return 'C'
+        if self._nba_general_position is None:
+            self._nba_general_position = _nba_general_position(self.pos)
+        return self._nba_general_position
 
     @property
     def mlb_general_position(self):
-        if self.pos in {'SP', 'RP'}:
-            return 'P'
-        return self.pos
+        if self._mlb_general_position is None:
+            self._mlb_general_position = _mlb_general_position(self.pos)
+        return self._mlb_general_position
 
     @property
     def short_name(self):
-        s = self.name.split()
-
-        # DST
-        if len(s) == 1:
-            return self.name
-
-        # like "AJ McCarron"
-        if re.match(r'^[A-Z]{2}$', s[0]):
-            return s
-
-        return '{}. {}'.format(s[0][0], s[1])
-
-    def __set_from_data_cache(self, player_data):
-        if player_data is None:
-            return
-        for k, v in list(player_data.items()):
-            setattr(self, k, v)
+        if self._short_name is None:
+            self._short_name = _short_name(self.name)
+        return self._short_name
 
     def __format_v_avg(self):
         if self.v_avg > 0:
@@ -399,6 +441,40 @@ class Player(object):
         return '\x1b[0;31;40m{:0.2f}\x1b[0m'.format(self.v_avg)
 
 
+def _intern(value):
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def _nba_general_position(pos):
+    if pos == 'SG' or pos == 'PG' or pos == 'G':
+        return 'G'
+    elif pos == 'SF' or pos == 'PF' or pos == 'F':
+        return 'F'
+    return 'C'
+
+
+def _mlb_general_position(pos):
+    if pos in {'SP', 'RP'}:
+        return 'P'
+    return pos
+
+
+def _short_name(name):
+    s = name.split()
+
+    # DST
+    if len(s) == 1:
+        return name
+
+    # like "AJ McCarron"
+    if re.match(r'^[A-Z]{2}$', s[0]):
+        return s
+
+    return '{}. {}'.format(s[0][0], s[1])
+
+
 class Game:
     def __init__(self, team, opp):
         self.team = team
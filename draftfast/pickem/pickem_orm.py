@@ -73,6 +73,7 @@ class TieredLineup(object):
 
 
 class TieredPlayer(Player):
+    __slots__ = ('tier',)
 
     def __init__(self, tier, **kwargs):
         self.tier = tier
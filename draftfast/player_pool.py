@@ -1,18 +1,185 @@
+import heapq
+import random
+from copy import copy
 from random import uniform as runiform
 from typing import List
+import numpy as np
 from draftfast.orm import Player
-from draftfast.settings import PlayerPoolSettings
+from draftfast.rules import RuleSet
+from draftfast.settings import PlayerPoolSettings, OptimizerSettings
+from draftfast.lineup_constraints import (LineupConstraints,
+                                          PlayerGroupConstraint)
+
+
+# columns kept as integer codes into a list of distinct labels
+LABEL_COLUMNS = ('name', 'pos', 'team', 'matchup', 'real_pos')
+
+
+class PlayerPool(object):
+    '''
+    A player pool stored as NumPy columns, one row per player. Filtering
+    and randomization work on whole columns and return views sharing
+    the Player objects and label tables of the pool they come from.
+    Player objects are only looked up, or copied when a view changed
+    their projection, when a row is accessed.
+
+    Optimizer, filter_pool and run accept a PlayerPool wherever they
+    accept a list of players.
+    '''
+
+    def __init__(self, players=()):
+        players = list(players)
+        self._players = np.empty(len(players), dtype=object)
+        self._players[:] = players
+        self.cost = np.array([p.cost for p in players], dtype=float)
+        self.proj = np.array([p.proj for p in players], dtype=float)
+        self.average_score = np.array(
+            [p.average_score for p in players],
+            dtype=float,
+        )
+        self.lock = np.array([bool(p.lock) for p in players], dtype=bool)
+        self.ban = np.array([bool(p.ban) for p in players], dtype=bool)
+        self.position_lock = np.array(
+            [bool(p.position_lock) for p in players],
+            dtype=bool,
+        )
+        self.position_ban = np.array(
+            [bool(p.position_ban) for p in players],
+            dtype=bool,
+        )
+        # projections of the Player objects, and the rows differing
+        self._player_proj = self.proj.copy()
+        self._reweighted = np.zeros(len(players), dtype=bool)
+
+        self._labels = dict()
+        self._codes = dict()
+        for column in LABEL_COLUMNS:
+            labels, codes = _encode(
+                [getattr(p, column, None) for p in players]
+            )
+            self._labels[column] = labels
+            self._codes[column] = codes
+
+    def __len__(self):
+        return len(self._players)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        player = self._players[i]
+        if self._reweighted[i]:
+            player = copy(player)
+            player.proj = float(self.proj[i])
+        return player
+
+    def __repr__(self):
+        return '<PlayerPool: {} players>'.format(len(self))
+
+    def take(self, index) -> 'PlayerPool':
+        '''
+        View of the rows at index, an integer array or boolean mask.
+        '''
+        view = object.__new__(PlayerPool)
+        for key, value in vars(self).items():
+            if isinstance(value, np.ndarray):
+                value = value[index]
+            setattr(view, key, value)
+        view._codes = dict(
+            (column, codes[index]) for column, codes in self._codes.items()
+        )
+        return view
+
+    def with_projections(self, projections) -> 'PlayerPool':
+        '''
+        View of every row with projections replaced.
+        '''
+        view = self.take(slice(None))
+        view.proj = np.asarray(projections, dtype=float)
+        view._reweighted = view.proj != view._player_proj
+        return view
+
+    def randomized(self, randomize: float) -> 'PlayerPool':
+        '''
+        View scaling each projection by a factor drawn uniformly from
+        [1 - randomize, 1 + randomize], seeded from the random module.
+        '''
+        return self.with_projections(
+            projection_draws(self.proj, randomize, 1)[0]
+        )
+
+    def filter(self, settings: PlayerPoolSettings) -> 'PlayerPool':
+        '''
+        View of the rows passing the pool settings, randomized first if
+        settings.randomize is set. Locked players always pass.
+        '''
+        pool = self.randomized(settings.randomize) \
+            if settings.randomize else self
+
+        keep = np.ones(len(pool), dtype=bool)
+        for column, low, high in (
+            (pool.cost, settings.min_salary, settings.max_salary),
+            (pool.proj, settings.min_proj, settings.max_proj),
+            (pool.average_score, settings.min_avg, settings.max_avg),
+        ):
+            if low is not None:
+                keep &= column >= low
+            if high is not None:
+                keep &= column <= high
+
+        if keep.all():
+            return pool
+        return pool.take(keep | pool.lock)
+
+    def encoded(self, column: str) -> (list, np.ndarray):
+        '''
+        Labels present in this view, in first-seen order, and each row's
+        code into them.
+        '''
+        labels = self._labels[column]
+        codes = self._codes[column]
+        present, first = np.unique(codes, return_index=True)
+        present = present[np.argsort(first)]
+        remap = np.zeros(len(labels), dtype=int)
+        remap[present] = np.arange(len(present))
+        return [labels[c] for c in present.tolist()], remap[codes]
+
+    def mask(self, column: str, predicate) -> np.ndarray:
+        '''
+        Rows whose label in column satisfies predicate, calling it once
+        per distinct label.
+        '''
+        matches = np.array(
+            [bool(predicate(label)) for label in self._labels[column]],
+            dtype=bool,
+        )
+        if not len(matches):
+            return np.zeros(len(self), dtype=bool)
+        return matches[self._codes[column]]
 
 
 def filter_pool(pool: list,
                 player_settings: PlayerPoolSettings) -> List[Player]:
+    '''
+    Players passing the pool settings. The players are not modified;
+    randomized projections are set on copies. A PlayerPool is filtered
+    by column and returned as a PlayerPool view.
+    '''
+    if isinstance(pool, PlayerPool):
+        return pool.filter(player_settings)
+
     if player_settings.randomize:
+        randomized = []
         for player in pool:
             factor = 1 + runiform(
                 -player_settings.randomize,
                 player_settings.randomize
             )
+            player = copy(player)
             player.proj = player.proj * factor
+            randomized.append(player)
+        pool = randomized
 
     return list(filter(
         add_filters(player_settings),
@@ -20,6 +187,116 @@ def filter_pool(pool: list,
     ))
 
 
+def projection_draws(projections, randomize: float,
+                     iterations: int) -> np.ndarray:
+    '''
+    Randomized projections for several lineups at once, as an
+    (iterations x players) matrix. Each entry scales a projection by a
+    factor drawn uniformly from [1 - randomize, 1 + randomize], as
+    filter_pool does one lineup at a time. The generator is seeded from
+    the random module so random.seed keeps draws reproducible.
+    '''
+    projections = np.asarray(projections, dtype=float)
+    rng = np.random.RandomState(random.getrandbits(32))
+    factors = rng.uniform(
+        1 - randomize,
+        1 + randomize,
+        size=(iterations, len(projections)),
+    )
+    return factors * projections
+
+
+def prune_dominated(pool: list,
+                    rule_set: RuleSet,
+                    optimizer_settings: OptimizerSettings,
+                    lineup_constraints: LineupConstraints,
+                    exposure_dict: dict = dict()) -> List[Player]:
+    '''
+    Drops players who cannot be in an optimal lineup: a player is
+    dominated once k other players at the same position are no more
+    expensive and projected at least as high, where k is the most
+    slots the position can fill times one plus the number of existing
+    rosters (each uniqueness cut can block substitutes).
+
+    Locked, position locked and grouped players are never pruned, and
+    banned, grouped or multi-position players never count as
+    dominators. When stacks, combos, min teams or opposing defense
+    rules are set, dominators must share the player's team and matchup.
+    '''
+    if rule_set.salary_min:
+        return pool
+
+    showdown = rule_set.game_type == 'showdown'
+    locked = set(exposure_dict.get('locked', []))
+    banned = set(exposure_dict.get('banned', []))
+    grouped = set()
+    for constraint in lineup_constraints:
+        if isinstance(constraint, PlayerGroupConstraint):
+            grouped.update(constraint.players)
+
+    team_sensitive = bool(
+        optimizer_settings.stacks or
+        optimizer_settings.force_combo or
+        optimizer_settings.min_teams > 1 or
+        optimizer_settings.no_offense_against_defense or
+        showdown and optimizer_settings.no_defense_against_captain
+    )
+
+    max_slots = {pos: ub for pos, _, ub in rule_set.position_limits}
+    depth = 1 + len(optimizer_settings.existing_rosters or [])
+
+    def group_key(p):
+        if team_sensitive:
+            return p.pos, getattr(p, 'real_pos', None), p.team, p.matchup
+        return p.pos, getattr(p, 'real_pos', None)
+
+    def is_protected(p):
+        return p.lock or p.position_lock or p.name in locked or \
+            p.name in grouped or \
+            lineup_constraints.is_locked(p.name) or \
+            lineup_constraints.is_position_locked(p.solver_id)
+
+    def can_dominate(p):
+        return not (
+            p.ban or p.multi_position or p.name in banned or
+            p.name in grouped or
+            lineup_constraints.is_banned(p.name) or
+            lineup_constraints.is_position_banned(p.solver_id)
+        )
+
+    groups = dict()
+    for i, p in enumerate(pool):
+        groups.setdefault(group_key(p), []).append(i)
+
+    pruned = set()
+    for (pos, _, *_), indices in groups.items():
+        # a showdown name can also fill a slot at the other position
+        slots = rule_set.roster_size if showdown else \
+            max_slots.get(pos, rule_set.roster_size)
+        k = slots * depth
+
+        best = []
+        seen_names = set()
+        indices.sort(key=lambda i: (pool[i].cost, -pool[i].proj, i))
+        for i in indices:
+            p = pool[i]
+            if len(best) == k and best[0] >= p.proj and \
+                    not is_protected(p):
+                pruned.add(i)
+
+            if can_dominate(p) and p.name not in seen_names:
+                seen_names.add(p.name)
+                if len(best) < k:
+                    heapq.heappush(best, p.proj)
+                else:
+                    heapq.heappushpop(best, p.proj)
+
+    kept = [i for i in range(len(pool)) if i not in pruned]
+    if isinstance(pool, PlayerPool):
+        return pool.take(np.array(kept, dtype=int))
+    return [pool[i] for i in kept]
+
+
 def add_filters(settings: PlayerPoolSettings):
     def filter_fn(player: Player):
         kwargs = {'player': player, 'settings': settings}
@@ -97,3 +374,19 @@ def _is_below_max_avg(player, settings):
     if settings.max_avg is None:
         return True
     return player.average_score <= settings.max_avg
+
+
+def _encode(values: list) -> (list, np.ndarray):
+    """
+    Integer codes for a column of labels, in first-seen label order.
+    """
+    labels = []
+    codes_by_label = dict()
+    codes = np.empty(len(values), dtype=int)
+    for i, value in enumerate(values):
+        if value not in codes_by_label:
+            codes_by_label[value] = len(labels)
+            labels.append(value)
+        codes[i] = codes_by_label[value]
+
+    return labels, codes
@@ -0,0 +1,228 @@
+import math
+from typing import List
+from draftfast.optimizer import Optimizer
+from draftfast.orm import Player
+from draftfast.rules import RuleSet
+from draftfast.settings import OptimizerSettings
+from draftfast.lineup_constraints import LineupConstraints
+
+EPSILON = 1e-9
+
+# best projected players of each position kept by candidate_players
+CANDIDATES_PER_POSITION = 5
+
+
+class PortfolioOptimizer(Optimizer):
+    '''
+    Solves a portfolio of lineups as one model. Every lineup gets its own
+    copy of the player variables and of the per lineup constraints.
+    Across copies:
+
+    - each exposure bound becomes one constraint on the number of
+      lineups holding the player, so exposures are met exactly or the
+      portfolio is reported infeasible;
+    - every pair of lineups shares at most as many players as
+      OptimizerSettings.uniques allows, through one continuous overlap
+      variable per player and pair;
+    - lineups are ordered by projection, so permuting them does not
+      yield new solutions.
+
+    The objective is the total projection of the portfolio. The model
+    grows with the square of the number of lineups times the number of
+    players; run_multi keeps it small by solving over candidate_players
+    only, which makes its portfolio a heuristic rather than the best
+    portfolio of the whole pool.
+    '''
+
+    def __init__(
+        self,
+        players: List[Player],
+        rule_set: RuleSet,
+        settings: OptimizerSettings,
+        lineup_constraints: LineupConstraints,
+        lineups: int,
+        exposure_bounds: List[dict] = (),
+    ):
+        self.lineups = lineups
+        self.exposure_bounds = list(exposure_bounds)
+        super().__init__(
+            players=players,
+            rule_set=rule_set,
+            settings=settings,
+            lineup_constraints=lineup_constraints,
+            exposure_dict=dict(),
+        )
+        # cuts against prior rosters apply to every copy
+        self.lazy_uniqueness = False
+
+    def _create_model(self):
+        super()._create_model()
+        self.copies = [self.variables] + [
+            [
+                self.solver.IntVar(
+                    0,
+                    1,
+                    player.solver_id + _suffix(k),
+                )
+                for player in self.players
+            ]
+            for k in range(1, self.lineups)
+        ]
+        self.copy_exposure_constraints = [dict() for _ in self.copies]
+
+    def build(self):
+        '''
+        Emits the per lineup constraints once per copy, then the
+        exposure, uniqueness and ordering constraints across copies.
+        '''
+        for k, variables in enumerate(self.copies):
+            self.variables = variables
+            self.variable_suffix = _suffix(k)
+            super().build()
+        self.variables = self.copies[0]
+        self.variable_suffix = ''
+
+        self._set_exposure_bounds()
+        self._set_pairwise_uniqueness()
+        self._set_lineup_order()
+        self.built = True
+
+    def add_no_duplicate_lineup(self, roster):
+        self.existing_rosters.append(roster)
+        if self.built:
+            for variables in self.copies:
+                self.variables = variables
+                self._set_no_duplicate_lineup(roster)
+            self.variables = self.copies[0]
+
+    def set_projections(self, projections):
+        for variables in self.copies:
+            self.variables = variables
+            super().set_projections(projections)
+        self.variables = self.copies[0]
+
+    def set_exposure(self, exposure_dict: dict):
+        '''
+        Applies exposure locks and bans to every lineup, i.e. as
+        exposure bounds of 1 and 0.
+        '''
+        for variables, constraints in zip(self.copies,
+                                          self.copy_exposure_constraints):
+            self.variables = variables
+            self.exposure_constraints = constraints
+            super().set_exposure(exposure_dict)
+        self.variables = self.copies[0]
+        self.exposure_constraints = self.copy_exposure_constraints[0]
+
+    def set_hint(self, rosters):
+        '''
+        Suggests rosters as the lineups of the first solution, e.g.
+        lineups solved one after another. Rosters are taken in order of
+        projection to match the lineup order.
+        '''
+        if not self.built:
+            self.build()
+
+        lineups = []
+        for roster in rosters[:self.lineups]:
+            ids = set(p.solver_id for p in roster.players)
+            lineups.append([p.solver_id in ids for p in self.players])
+        projections = self.projections.tolist()
+        lineups.sort(
+            key=lambda selected: sum(
+                proj for proj, chosen in zip(projections, selected)
+                if chosen
+            ),
+            reverse=True,
+        )
+
+        variables = []
+        values = []
+        for copy, selected in zip(self.copies, lineups):
+            variables += copy
+            values += [float(chosen) for chosen in selected]
+        self.solver.SetHint(variables, values)
+
+    def selected_indices(self, lineup: int = 0) -> List[int]:
+        '''
+        Indices of the players of one lineup of the last solution.
+        '''
+        return [
+            i for i, v in enumerate(self.copies[lineup])
+            if v.solution_value() > 0.5
+        ]
+
+    def _set_exposure_bounds(self):
+        for bound in self.exposure_bounds:
+            name = bound['name']
+            if name not in self.name_to_idx_map:
+                continue
+
+            constraint = self.solver.Constraint(
+                math.ceil(bound['min'] * self.lineups - EPSILON),
+                math.floor(bound['max'] * self.lineups + EPSILON),
+            )
+            for variables in self.copies:
+                for i in self.name_to_idx_map[name]:
+                    constraint.SetCoefficient(variables[i], 1)
+
+    def _set_pairwise_uniqueness(self):
+        '''
+        overlap[i] >= a[i] + b[i] - 1 for every player i a pair of
+        lineups a, b may hold, and sum(overlap) <= max repeats.
+        '''
+        available = [
+            i for i in range(len(self.players))
+            if not (self.banned[i] or self.position_banned[i])
+        ]
+        max_repeats = self._max_repeats()
+
+        for a in range(self.lineups):
+            for b in range(a + 1, self.lineups):
+                repeats = self.solver.Constraint(0, max_repeats)
+                for i in available:
+                    overlap = self.solver.NumVar(0, 1, '')
+                    both = self.solver.Constraint(
+                        -self.solver.infinity(),
+                        1,
+                    )
+                    both.SetCoefficient(self.copies[a][i], 1)
+                    both.SetCoefficient(self.copies[b][i], 1)
+                    both.SetCoefficient(overlap, -1)
+                    repeats.SetCoefficient(overlap, 1)
+
+    def _set_lineup_order(self):
+        projections = self.projections.tolist()
+        for k in range(1, self.lineups):
+            order = self.solver.Constraint(0, self.solver.infinity())
+            for proj, before, after in zip(
+                projections,
+                self.copies[k - 1],
+                self.copies[k],
+            ):
+                order.SetCoefficient(before, proj)
+                order.SetCoefficient(after, -proj)
+
+
+def _suffix(k: int) -> str:
+    return ' #{}'.format(k) if k else ''
+
+
+def candidate_players(players, rosters, exposure_bounds=(),
+                      per_position: int = CANDIDATES_PER_POSITION) -> list:
+    '''
+    The players of rosters, e.g. lineups solved one after another, plus
+    every bounded player and the per_position best projected players
+    of each position.
+    '''
+    names = set(p.name for roster in rosters for p in roster.players)
+    names.update(bound['name'] for bound in exposure_bounds)
+
+    by_position = dict()
+    for p in players:
+        by_position.setdefault(p.pos, []).append(p)
+    for position_players in by_position.values():
+        position_players.sort(key=lambda p: p.proj, reverse=True)
+        names.update(p.name for p in position_players[:per_position])
+
+    return [p for p in players if p.name in names]
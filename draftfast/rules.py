@@ -263,7 +263,7 @@ DK_WNBA_RULE_SET = RuleSet(
     roster_size=ROSTER_SIZE[DRAFT_KINGS]['WNBA'],
     salary_max=SALARY_CAP[DRAFT_KINGS]['WNBA'],
     position_limits=POSITIONS[DRAFT_KINGS]['WNBA'],
-    general_position_limits=NBA_GENERAL_POSITIONS,
+    general_position_limits=WNBA_GENERAL_POSITIONS,
 )
 
 FD_WNBA_RULE_SET = RuleSet(
@@ -272,7 +272,7 @@ FD_WNBA_RULE_SET = RuleSet(
     roster_size=ROSTER_SIZE[FAN_DUEL]['WNBA'],
     salary_max=SALARY_CAP[FAN_DUEL]['WNBA'],
     position_limits=POSITIONS[FAN_DUEL]['WNBA'],
-    general_position_limits=NBA_GENERAL_POSITIONS,
+    general_position_limits=WNBA_GENERAL_POSITIONS,
 )
 
 DK_NFL_RULE_SET = RuleSet(
@@ -1,3 +1,10 @@
+from draftfast.solvers import CBC
+
+# formulations of the no_offense_against_defense constraint
+PAIRWISE = 'PAIRWISE'
+BIG_M = 'BIG_M'
+
+
 class PlayerPoolSettings(object):
 
     def __init__(self, min_proj=None, max_proj=None,
@@ -50,7 +57,20 @@ class OptimizerSettings(object):
                  no_offense_against_defense=False,
                  no_defense_against_captain=False,
                  showdown_teams=None,
-                 min_teams=2):
+                 min_teams=2,
+                 persistent_model=False,
+                 solver=CBC,
+                 solver_threads=None,
+                 no_opp_defense_formulation=PAIRWISE,
+                 prune_dominated=False,
+                 time_limit=None,
+                 mip_gap=None,
+                 total_time_limit=None,
+                 collect_stats=False,
+                 stats_callback=None,
+                 exact_showdown=True,
+                 portfolio=False,
+                 lazy_uniqueness=False):
         self.stacks = stacks
         self.existing_rosters = existing_rosters or []
         self.force_combo = force_combo
@@ -60,6 +80,23 @@ class OptimizerSettings(object):
         self.no_defense_against_captain = no_defense_against_captain
         self.showdown_teams = showdown_teams
         self.min_teams = min_teams
+        self.persistent_model = persistent_model
+        self.solver = solver
+        self.solver_threads = solver_threads
+        self.no_opp_defense_formulation = no_opp_defense_formulation
+        self.prune_dominated = prune_dominated
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.total_time_limit = total_time_limit
+        self.collect_stats = collect_stats
+        self.stats_callback = stats_callback
+        self.exact_showdown = exact_showdown
+        self.portfolio = portfolio
+        self.lazy_uniqueness = lazy_uniqueness
+
+    @property
+    def stats_enabled(self) -> bool:
+        return bool(self.collect_stats or self.stats_callback)
 
     # TODO: format this like a proper repr(), i.e. <OptimizerSettings: ...>
     def __repr__(self):
@@ -77,6 +114,18 @@ class OptimizerSettings(object):
                 )
         if self.min_teams:
             lines.append('Min teams: {}'.format(self.min_teams))
+        if self.solver != CBC:
+            lines.append('Solver: {}'.format(self.solver))
+        if self.time_limit:
+            lines.append('Time limit: {}s'.format(self.time_limit))
+        if self.mip_gap:
+            lines.append('MIP gap: {}'.format(self.mip_gap))
+        if self.portfolio:
+            lines.append('Portfolio: {}'.format(self.portfolio))
+        if self.total_time_limit:
+            lines.append('Total time limit: {}s'.format(
+                self.total_time_limit
+            ))
         if self.no_offense_against_defense:
             lines.append('No offense against D: {}'.format(
                     self.no_offense_against_defense
@@ -1,22 +1,53 @@
-from draftfast.orm import Player
-from copy import deepcopy
+from draftfast.orm import Player, CACHED_KEYS
+
+
+class _Shared(object):
+    '''
+    Reads a Player field from the ShowdownPlayer's base record unless
+    the ShowdownPlayer set its own value. Writes never reach the base,
+    which CPT and FLEX variants share.
+    '''
+
+    def __init__(self, name):
+        self.name = name
+        self.slot = Player.__dict__[name]
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        try:
+            return self.slot.__get__(obj, cls)
+        except AttributeError:
+            return getattr(obj.base, self.name)
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
+
+    def __delete__(self, obj):
+        self.slot.__delete__(obj)
 
 
 class ShowdownPlayer(Player):
-    def __init__(self, player: Player, captain: bool = False):
-        for k, v in player.__dict__.items():
-            if hasattr(self, k) or k.startswith('__'):
-                continue
-            setattr(self, k, deepcopy(v))
-
-        if captain:
-            self.real_pos = self.pos
-            self.pos = 'CPT'
-            self.captain = True
-        else:
-            self.real_pos = self.pos
-            self.pos = 'FLEX'
-            self.captain = False
+    '''
+    A CPT or FLEX slot for a player. Slots of one player can share a
+    base Player record; each only holds its position, captain flag and
+    cost multiplier, plus any field set on it directly (e.g. a
+    randomized projection).
+    '''
+    __slots__ = ('base', 'captain', 'cost_multiplier')
+
+    def __init__(self, player: Player, captain: bool = False,
+                 cost_multiplier: float = 1):
+        self.base = player
+        self.captain = captain
+        self.cost_multiplier = cost_multiplier
+        for cached in CACHED_KEYS:
+            object.__setattr__(self, cached, None)
+        self.pos = 'CPT' if captain else 'FLEX'
+
+    @property
+    def real_pos(self):
+        return self.base.pos
 
     @property
     def formatted_position(self):
@@ -27,3 +58,21 @@ class ShowdownPlayer(Player):
         if self.pos == 'CPT':
             return self.proj / 1.5 - self.average_score
         return self.proj - self.average_score
+
+
+for _name in Player.__slots__:
+    if _name not in ('pos', 'cost') + CACHED_KEYS:
+        setattr(ShowdownPlayer, _name, _Shared(_name))
+
+
+class _Cost(_Shared):
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        try:
+            return self.slot.__get__(obj, cls)
+        except AttributeError:
+            return obj.base.cost * obj.cost_multiplier
+
+
+ShowdownPlayer.cost = _Cost('cost')
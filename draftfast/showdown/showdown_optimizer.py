@@ -0,0 +1,392 @@
+import math
+import time
+from typing import List
+import numpy as np
+from ortools.linear_solver import pywraplp
+from draftfast.dke_exceptions import InvalidBoundsException
+from draftfast.optimizer import Optimizer, _encode
+from draftfast.orm import Player
+from draftfast.rules import RuleSet
+from draftfast.settings import OptimizerSettings
+from draftfast.lineup_constraints import LineupConstraints
+from draftfast.stats import SolveStats
+
+SHOWDOWN_SOLVER = 'SHOWDOWN'
+CAPTAIN = 'CPT'
+FLEX = 'FLEX'
+
+# salary columns of the knapsack bound table; coarser salary units
+# only loosen the bound
+MAX_BUDGET_UNITS = 2000
+EPSILON = 1e-9
+# the bound table is single precision; pad bounds by more than its
+# rounding error so they stay upper bounds
+BOUND_TOLERANCE = 1e-3
+# the bound table keeps every BOUND_STRIDE-th suffix of the FLEX list;
+# a longer suffix still bounds a shorter one
+BOUND_STRIDE = 8
+
+
+class ShowdownOptimizer(Optimizer):
+    '''
+    Exact solver for showdown slates without a MIP model. Captains are
+    tried best bound first and the FLEX players of each are found by a
+    depth-first branch and bound over FLEX players sorted by projection.
+    Nodes are bounded by a knapsack table built once with NumPy: the
+    best projection of r FLEX players from a suffix of the sorted list
+    within a salary budget.
+
+    Lineups match the MIP's constraints: locks and bans, one row per
+    player name, no_defense_against_captain, team limits, salary range
+    and uniqueness against existing rosters.
+    '''
+
+    @staticmethod
+    def supports(players: List[Player], rule_set: RuleSet,
+                 settings: OptimizerSettings,
+                 lineup_constraints: LineupConstraints) -> bool:
+        '''
+        Whether a slate fits the captain plus FLEX structure this solver
+        handles. Stacks, combos, group constraints and more than one
+        position-locked captain need the MIP.
+        '''
+        if rule_set.game_type != 'showdown' or not settings.exact_showdown:
+            return False
+
+        if settings.stacks or settings.force_combo or \
+                rule_set.general_position_limits or \
+                lineup_constraints.has_group_constraints():
+            return False
+
+        locked_captains = [
+            p for p in players
+            if p.pos == CAPTAIN and (
+                p.position_lock or
+                lineup_constraints.is_position_locked(p.solver_id)
+            )
+        ]
+        if len(locked_captains) > 1:
+            return False
+
+        limits = {pos: (lb, ub) for pos, lb, ub in rule_set.position_limits}
+        if FLEX not in limits or set(limits) - {CAPTAIN, FLEX}:
+            return False
+        if limits[FLEX][0] != limits[FLEX][1] or \
+                limits.get(CAPTAIN, (1, 1)) != (1, 1):
+            return False
+        if limits[FLEX][0] + (CAPTAIN in limits) != rule_set.roster_size:
+            return False
+
+        return all(p.pos in limits for p in players)
+
+    @property
+    def proven_optimal(self) -> bool:
+        return self.status == pywraplp.Solver.OPTIMAL
+
+    def _create_model(self):
+        self.solver = None
+        self.variables = []
+        self.solution = None
+        self.objective_value = None
+        self.nodes = 0
+        self.flex_count = dict(
+            (pos, lb) for pos, lb, _ in self.position_limits
+        )[FLEX]
+        self.has_captain = CAPTAIN in [p[0] for p in self.position_limits]
+
+    def build(self):
+        '''
+        Computes player masks and the knapsack bound table.
+        '''
+        players = self.players
+        locked = self.locked | self.position_locked
+        banned = self.banned | self.position_banned
+        if np.any(locked & banned):
+            raise InvalidBoundsException
+        excluded = set(np.flatnonzero(banned).tolist())
+
+        # each player blocks its own name and the players it may not
+        # be rostered with
+        name_labels, self.name_codes = _encode([p.name for p in players])
+        name_masks = [0] * len(name_labels)
+        for i, code in enumerate(self.name_codes.tolist()):
+            name_masks[code] |= 1 << i
+        self.block_masks = [name_masks[c] for c in self.name_codes.tolist()]
+        if self._has_no_opp_defense():
+            for offensive, defensive in self._no_opp_defense_indices():
+                for p in offensive.tolist():
+                    for d in defensive.tolist():
+                        if p == d:
+                            excluded.add(p)
+                        self.block_masks[p] |= 1 << d
+                        self.block_masks[d] |= 1 << p
+
+        self.locked_names = frozenset(
+            self.name_codes[i] for i in np.flatnonzero(self.locked).tolist()
+        )
+        self.required = [
+            i for i in np.flatnonzero(self.position_locked).tolist()
+            if players[i].pos == FLEX
+        ]
+
+        flex = self.position_to_idx_map.get(FLEX, np.array([], dtype=int))
+        flex = flex[np.lexsort((flex, -self.projections[flex]))]
+        self.flex = [i for i in flex.tolist() if i not in excluded]
+
+        captains = self.position_to_idx_map.get(
+            CAPTAIN,
+            np.array([], dtype=int),
+        )
+        captains = [i for i in captains.tolist() if i not in excluded]
+        locked_captains = [i for i in captains if self.position_locked[i]]
+        self.captains = locked_captains or captains
+
+        self.roster_hits = [[] for _ in players]
+        for r, roster in enumerate(self.existing_rosters):
+            self._add_roster_hits(r, roster)
+
+        self._set_bound_table()
+        self.built = True
+
+    def add_no_duplicate_lineup(self, roster):
+        self.existing_rosters.append(roster)
+        if self.built:
+            self._add_roster_hits(len(self.existing_rosters) - 1, roster)
+
+    def set_projections(self, projections):
+        # the FLEX order and bound table depend on projections
+        self.projections = np.asarray(projections, dtype=float)
+        self.built = False
+
+    def solve(self, time_limit: float = None) -> bool:
+        '''
+        Finds an optimal lineup. The search is exact, so time_limit and
+        OptimizerSettings.mip_gap do not apply.
+        '''
+        self.last_build_time = 0
+        if not self.built:
+            start = time.perf_counter()
+            self.build()
+            self.last_build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.solution, self.objective_value = self._search()
+        self.last_solve_time = time.perf_counter() - start
+
+        if self.solution is None:
+            self.status = pywraplp.Solver.INFEASIBLE
+            return False
+
+        self.status = pywraplp.Solver.OPTIMAL
+        return True
+
+    def selected_indices(self) -> List[int]:
+        return sorted(self.solution or [])
+
+    def get_stats(self, pool_time: float = 0) -> SolveStats:
+        return SolveStats(
+            pool_time=pool_time,
+            build_time=self.last_build_time,
+            solve_time=self.last_solve_time,
+            variables=len(self.players),
+            constraints=0,
+            nodes=self.nodes,
+            objective=self.objective_value,
+            best_bound=self.objective_value,
+            status=self.status,
+            proven_optimal=self.proven_optimal,
+            solver=SHOWDOWN_SOLVER,
+        )
+
+    def _add_roster_hits(self, r: int, roster):
+        for player in roster.players:
+            i = self.player_to_idx_map.get(player.solver_id)
+            if i is not None:
+                self.roster_hits[i].append(r)
+
+    def _set_bound_table(self):
+        '''
+        bounds[s, r, w] is the best projection of exactly r players from
+        self.flex[s * BOUND_STRIDE:] whose salaries, rounded down to
+        self.unit, fit in w units, or -inf if there is none.
+        '''
+        costs = self.costs[self.flex]
+        unit = 0
+        if costs.size and np.all(costs == np.round(costs)):
+            unit = float(np.gcd.reduce(costs.astype(np.int64)))
+        self.unit = max(unit, self.salary_max / MAX_BUDGET_UNITS, 1)
+        self.budget_units = int(self.salary_max // self.unit)
+
+        k = self.flex_count
+        units = self.budget_units
+        suffix = np.full((k + 1, units + 1), -np.inf, dtype=np.float32)
+        suffix[0, :] = 0
+        bounds = np.empty(
+            (len(self.flex) // BOUND_STRIDE + 1, k + 1, units + 1),
+            dtype=np.float32,
+        )
+        bounds[-1] = suffix
+        for j in range(len(self.flex) - 1, -1, -1):
+            w = int(costs[j] // self.unit)
+            if w <= units:
+                # descending r so each item is taken at most once
+                for r in range(k, 0, -1):
+                    np.maximum(
+                        suffix[r, w:],
+                        suffix[r - 1, :units + 1 - w] +
+                        self.projections[self.flex[j]],
+                        out=suffix[r, w:],
+                    )
+            if j % BOUND_STRIDE == 0:
+                bounds[j // BOUND_STRIDE] = suffix
+        self.bounds = bounds
+
+    def _units_left(self, spent: float) -> int:
+        return min(
+            math.floor((self.salary_max - spent) / self.unit + 1e-6),
+            self.budget_units,
+        )
+
+    def _search(self):
+        self.nodes = 0
+        best = [-np.inf, None]
+
+        captains = self.captains if self.has_captain else [None]
+        if self.has_captain:
+            # best lineup value for every captain, ignoring the FLEX
+            # players it excludes
+            idx = np.array(captains, dtype=int)
+            units = np.floor(
+                (self.salary_max - self.costs[idx]) / self.unit + 1e-6
+            ).astype(int)
+            upper = np.full(len(idx), -np.inf)
+            fits = units >= 0
+            upper[fits] = self.projections[idx[fits]] + BOUND_TOLERANCE + \
+                self.bounds[
+                    0,
+                    self.flex_count,
+                    np.minimum(units[fits], self.budget_units),
+                ]
+            order = np.lexsort((idx, -upper))
+            captains = [(captains[o], upper[o]) for o in order.tolist()]
+        else:
+            captains = [(None, np.inf)]
+
+        for captain, upper in captains:
+            if upper <= best[0] + EPSILON:
+                break
+            self._search_captain(captain, best)
+
+        if best[1] is None:
+            return None, None
+        return best[1], best[0]
+
+    def _search_captain(self, captain, best):
+        proj = self.projections.tolist()
+        cost = self.costs.tolist()
+        team_codes = self.team_codes.tolist()
+        counted_teams = [bool(t) for t in self.team_labels]
+        enforce_teams = self.settings.min_teams > 1
+        min_teams = self.settings.min_teams
+        max_per_team = self.max_players_per_team
+        max_repeats = self._max_repeats()
+        flex = self.flex
+        bounds = self.bounds
+        masks = self.block_masks
+        hits = self.roster_hits
+        name_codes = self.name_codes.tolist()
+
+        picks = []
+        team_counts = [0] * len(self.team_labels)
+        overlaps = [0] * len(self.existing_rosters)
+        state = {'teams': 0}
+
+        def fits(i, blocked):
+            if blocked >> i & 1:
+                return False
+            t = team_codes[i]
+            if enforce_teams and counted_teams[t] and \
+                    team_counts[t] + 1 > max_per_team:
+                return False
+            return all(overlaps[r] < max_repeats for r in hits[i])
+
+        def add(i):
+            t = team_codes[i]
+            team_counts[t] += 1
+            if counted_teams[t] and team_counts[t] == 1:
+                state['teams'] += 1
+            for r in hits[i]:
+                overlaps[r] += 1
+            picks.append(i)
+
+        def remove(i):
+            t = team_codes[i]
+            team_counts[t] -= 1
+            if counted_teams[t] and team_counts[t] == 0:
+                state['teams'] -= 1
+            for r in hits[i]:
+                overlaps[r] -= 1
+            picks.pop()
+
+        value = 0
+        spent = 0
+        blocked = 0
+        need = self.locked_names
+        start = [captain] if captain is not None else []
+        for i in start + self.required:
+            if not fits(i, blocked):
+                return
+            add(i)
+            value += proj[i]
+            spent += cost[i]
+            blocked |= masks[i]
+            need = need - {name_codes[i]}
+
+        def dfs(position, r, value, spent, blocked, need):
+            self.nodes += 1
+            if r == 0:
+                if need or spent < self.salary_min - EPSILON:
+                    return
+                if enforce_teams and state['teams'] < min_teams:
+                    return
+                if value > best[0] + EPSILON:
+                    best[0] = value
+                    best[1] = list(picks)
+                return
+
+            if len(need) > r:
+                return
+            if enforce_teams and state['teams'] + r < min_teams:
+                return
+            units = self._units_left(spent)
+            if units < 0:
+                return
+
+            for j in range(position, len(flex) - r + 1):
+                bound = bounds[j // BOUND_STRIDE, r, units]
+                if value + bound + BOUND_TOLERANCE <= \
+                        best[0] + EPSILON:
+                    # the rest of the list cannot do better
+                    return
+                i = flex[j]
+                if spent + cost[i] > self.salary_max + EPSILON:
+                    continue
+                if not fits(i, blocked):
+                    continue
+                add(i)
+                dfs(
+                    j + 1,
+                    r - 1,
+                    value + proj[i],
+                    spent + cost[i],
+                    blocked | masks[i],
+                    need - {name_codes[i]},
+                )
+                remove(i)
+
+        r = self.flex_count - len(self.required)
+        if r >= 0:
+            dfs(0, r, value, spent, blocked, need)
+        # dfs refers to itself; break the cycle so the bound table is
+        # not kept alive until the next garbage collection
+        dfs = None
@@ -0,0 +1,284 @@
+'''
+Monte Carlo simulation of optimal lineups.
+
+Player outcomes are drawn from a multivariate normal around their
+projections, with teammates positively correlated and defenses
+negatively correlated with the players they face. The optimal lineup
+of every draw is solved on one optimizer model per process, only
+swapping the objective, and the result reports how often each player
+and each team stack was optimal.
+
+    result = simulate(
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=player_pool,
+        iterations=10000,
+        max_workers=8,
+    )
+    result.player_frequency()
+'''
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from typing import List
+import numpy as np
+from draftfast import player_pool as pool
+from draftfast.optimizer import Optimizer, _encode, _opponents
+from draftfast.showdown.showdown_optimizer import ShowdownOptimizer
+from draftfast.rules import RuleSet
+from draftfast.settings import PlayerPoolSettings, OptimizerSettings
+from draftfast.lineup_constraints import LineupConstraints
+
+# standard deviation of a player's outcome as a share of projection
+VOLATILITY = 0.25
+TEAMMATE_CORRELATION = 0.2
+OPPOSING_DEFENSE_CORRELATION = -0.3
+# draws sampled and handed to a worker process at a time
+CHUNK_SIZE = 500
+
+
+class SimulationResult(object):
+    '''
+    Optimal lineup counts over a simulation. Stacks are keyed by the
+    sorted names of at least min_stack_size players from one team in
+    an optimal lineup.
+    '''
+
+    def __init__(self, iterations=0, infeasible=0, player_counts=None,
+                 stack_counts=None):
+        self.iterations = iterations
+        self.infeasible = infeasible
+        self.player_counts = player_counts or Counter()
+        self.stack_counts = stack_counts or Counter()
+
+    def __repr__(self):
+        return '<SimulationResult: {} iterations, {} infeasible>'.format(
+            self.iterations,
+            self.infeasible,
+        )
+
+    def player_frequency(self) -> dict:
+        '''
+        Share of draws in which each player was optimal, most frequent
+        first.
+        '''
+        return self._frequency(self.player_counts)
+
+    def stack_frequency(self) -> dict:
+        '''
+        Share of draws in which each stack was optimal, most frequent
+        first.
+        '''
+        return self._frequency(self.stack_counts)
+
+    def _frequency(self, counts: Counter) -> dict:
+        if not self.iterations:
+            return dict()
+        return dict(
+            (key, count / self.iterations)
+            for key, count in counts.most_common()
+        )
+
+
+def simulate(
+    rule_set: RuleSet,
+    player_pool: list,
+    iterations: int,
+    constraints: LineupConstraints = LineupConstraints(),
+    player_settings: PlayerPoolSettings = PlayerPoolSettings(),
+    optimizer_settings: OptimizerSettings = OptimizerSettings(),
+    volatility=VOLATILITY,
+    teammate_correlation: float = TEAMMATE_CORRELATION,
+    opposing_defense_correlation: float = OPPOSING_DEFENSE_CORRELATION,
+    min_stack_size: int = 2,
+    random_seed=None,
+    max_workers: int = None,
+) -> SimulationResult:
+    '''
+    Solves the optimal lineup for iterations correlated draws of player
+    outcomes. volatility is the standard deviation of an outcome as a
+    share of projection, either one value or a dict by player name.
+    Rows sharing a name (multi-position players, showdown captains)
+    share one outcome, scaled by their own projection.
+    '''
+    if not isinstance(rule_set, RuleSet):
+        raise Exception("RuleSet not defined. Please refer to the docs")
+
+    filter_settings = copy(player_settings)
+    filter_settings.randomize = None
+    players = pool.filter_pool(player_pool, filter_settings)
+
+    name_labels, name_codes = _encode([p.name for p in players])
+    correlation = correlation_matrix(
+        players,
+        rule_set,
+        teammate_correlation=teammate_correlation,
+        opposing_defense_correlation=opposing_defense_correlation,
+    )
+    # distinct players in name_labels order
+    scale = _volatilities(name_labels, volatility)
+    factor = np.linalg.cholesky(_nearest_correlation(correlation)) * \
+        scale[:, None]
+    projections = np.array([p.proj for p in players], dtype=float)
+    rng = np.random.RandomState(random_seed)
+
+    def draws():
+        remaining = iterations
+        while remaining > 0:
+            size = min(CHUNK_SIZE, remaining)
+            remaining -= size
+            z = rng.standard_normal((size, len(name_labels))) @ factor.T
+            yield projections * (1 + z[:, name_codes])
+
+    # stats callbacks may not survive pickling to worker processes
+    settings = copy(optimizer_settings)
+    settings.collect_stats = False
+    settings.stats_callback = None
+    model_args = (players, rule_set, constraints, settings)
+
+    if max_workers and max_workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=model_args,
+        ) as executor:
+            lineups = [
+                lineup
+                for chunk in executor.map(_solve_worker_draws, draws())
+                for lineup in chunk
+            ]
+    else:
+        optimizer = _create_optimizer(*model_args)
+        lineups = [
+            lineup
+            for chunk in draws()
+            for lineup in _solve_draws(optimizer, chunk)
+        ]
+
+    return _summarize(players, lineups, min_stack_size)
+
+
+def correlation_matrix(
+    players: list,
+    rule_set: RuleSet,
+    teammate_correlation: float = TEAMMATE_CORRELATION,
+    opposing_defense_correlation: float = OPPOSING_DEFENSE_CORRELATION,
+) -> np.ndarray:
+    '''
+    Outcome correlations between distinct player names, in first-seen
+    order. Defensive players (RuleSet.defensive_positions) correlate
+    with opposing players; everyone else correlates with teammates.
+    '''
+    name_labels, name_codes = _encode([p.name for p in players])
+    first = np.unique(name_codes, return_index=True)[1]
+    distinct = [players[i] for i in first]
+
+    teams = np.array([p.team or '' for p in distinct])
+    defensive_positions = set(rule_set.defensive_positions or [])
+    defensive = np.array([
+        getattr(p, 'real_pos', p.pos) in defensive_positions
+        for p in distinct
+    ])
+    all_teams = set(teams.tolist()) - {''}
+    opposing = np.zeros((len(distinct), len(distinct)), dtype=bool)
+    for i, p in enumerate(distinct):
+        for team in _opponents(p, all_teams):
+            opposing[i, teams == team] = True
+    opposing = opposing | opposing.T
+
+    correlation = np.zeros((len(distinct), len(distinct)))
+    same_team = (teams[:, None] == teams[None, :]) & (teams[:, None] != '')
+    correlation[same_team] = teammate_correlation
+
+    against_defense = opposing & (defensive[:, None] ^ defensive[None, :])
+    correlation[against_defense] = opposing_defense_correlation
+    np.fill_diagonal(correlation, 1)
+    return correlation
+
+
+def _nearest_correlation(correlation: np.ndarray) -> np.ndarray:
+    '''
+    Clips negative eigenvalues so the matrix can be factored, then
+    rescales it back to a unit diagonal.
+    '''
+    values, vectors = np.linalg.eigh(correlation)
+    if values.min() > 1e-8:
+        return correlation
+
+    values = np.maximum(values, 1e-8)
+    repaired = (vectors * values) @ vectors.T
+    d = np.sqrt(np.diag(repaired))
+    return repaired / np.outer(d, d)
+
+
+def _volatilities(name_labels, volatility):
+    if not isinstance(volatility, dict):
+        return np.full(len(name_labels), float(volatility))
+    return np.array([
+        volatility.get(name, VOLATILITY) for name in name_labels
+    ], dtype=float)
+
+
+def _create_optimizer(players, rule_set, constraints, settings):
+    optimizer_class = Optimizer
+    if ShowdownOptimizer.supports(players, rule_set, settings,
+                                  constraints):
+        optimizer_class = ShowdownOptimizer
+
+    return optimizer_class(
+        players=players,
+        rule_set=rule_set,
+        settings=settings,
+        lineup_constraints=constraints,
+        exposure_dict=dict(),
+    )
+
+
+def _solve_draws(optimizer: Optimizer, draws: np.ndarray) -> List[tuple]:
+    '''
+    Optimal lineups as tuples of player indices, None for draws without
+    a feasible lineup.
+    '''
+    lineups = []
+    for projections in draws:
+        optimizer.set_projections(projections)
+        if optimizer.solve():
+            lineups.append(tuple(optimizer.selected_indices()))
+        else:
+            lineups.append(None)
+
+    return lineups
+
+
+_worker_optimizer = []
+
+
+def _init_worker(players, rule_set, constraints, settings):
+    _worker_optimizer.append(
+        _create_optimizer(players, rule_set, constraints, settings)
+    )
+
+
+def _solve_worker_draws(draws: np.ndarray) -> List[tuple]:
+    return _solve_draws(_worker_optimizer[0], draws)
+
+
+def _summarize(players: list, lineups: List[tuple],
+               min_stack_size: int) -> SimulationResult:
+    result = SimulationResult(iterations=len(lineups))
+    for lineup in lineups:
+        if lineup is None:
+            result.infeasible += 1
+            continue
+
+        by_team = dict()
+        for i in lineup:
+            player = players[i]
+            result.player_counts[player.name] += 1
+            if player.team:
+                by_team.setdefault(player.team, set()).add(player.name)
+
+        for names in by_team.values():
+            if len(names) >= min_stack_size:
+                result.stack_counts[tuple(sorted(names))] += 1
+
+    return result
@@ -0,0 +1,41 @@
+'''
+Solver backends for the optimizer. All backends ship with ortools, so
+the constraint builders in draftfast.optimizer can target any of them
+through pywraplp.
+'''
+from ortools.linear_solver import pywraplp
+from draftfast.dke_exceptions import UnsupportedSolverException
+
+CBC = 'CBC'
+SCIP = 'SCIP'
+CP_SAT = 'CP_SAT'
+
+SOLVER_TYPES = {
+    CBC: pywraplp.Solver.CBC_MIXED_INTEGER_PROGRAMMING,
+    SCIP: pywraplp.Solver.SCIP_MIXED_INTEGER_PROGRAMMING,
+    CP_SAT: pywraplp.Solver.SAT_INTEGER_PROGRAMMING,
+}
+
+
+def create_solver(backend: str = CBC, threads: int = None,
+                  name: str = 'FD') -> pywraplp.Solver:
+    if backend not in SOLVER_TYPES:
+        raise UnsupportedSolverException(
+            'Unknown solver backend {}, expected one of {}'.format(
+                backend,
+                ', '.join(SOLVER_TYPES.keys()),
+            )
+        )
+
+    solver = pywraplp.Solver(name, SOLVER_TYPES[backend])
+    if solver is None:
+        raise UnsupportedSolverException(
+            '{} is not available in this ortools build'.format(backend)
+        )
+
+    # CP-SAT maps threads to its number of search workers; the CBC
+    # build bundled with ortools is single threaded
+    if threads and backend != CBC:
+        solver.SetNumThreads(threads)
+
+    return solver
@@ -0,0 +1,54 @@
+class SolveStats(object):
+    '''
+    Timings and model statistics for a single lineup solve. Times are
+    in seconds; build_time is 0 for solves re-using a built model.
+    '''
+
+    def __init__(self, pool_time=0, build_time=0, solve_time=0,
+                 variables=0, constraints=0, nodes=None,
+                 objective=None, best_bound=None, status=None,
+                 proven_optimal=False, solver=None):
+        self.pool_time = pool_time
+        self.build_time = build_time
+        self.solve_time = solve_time
+        self.variables = variables
+        self.constraints = constraints
+        self.nodes = nodes
+        self.objective = objective
+        self.best_bound = best_bound
+        self.status = status
+        self.proven_optimal = proven_optimal
+        self.solver = solver
+
+    def __repr__(self):
+        return '<SolveStats: {}>'.format(', '.join(
+            '{}={}'.format(k, v) for k, v in self.to_dict().items()
+        ))
+
+    @property
+    def total_time(self):
+        return self.pool_time + self.build_time + self.solve_time
+
+    @property
+    def gap(self):
+        if self.objective is None or self.best_bound is None:
+            return None
+        return abs(self.best_bound - self.objective) / \
+            max(abs(self.objective), 1e-9)
+
+    def to_dict(self):
+        return {
+            'pool_time': self.pool_time,
+            'build_time': self.build_time,
+            'solve_time': self.solve_time,
+            'total_time': self.total_time,
+            'variables': self.variables,
+            'constraints': self.constraints,
+            'nodes': self.nodes,
+            'objective': self.objective,
+            'best_bound': self.best_bound,
+            'gap': self.gap,
+            'status': self.status,
+            'proven_optimal': self.proven_optimal,
+            'solver': self.solver,
+        }
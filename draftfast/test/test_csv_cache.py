@@ -0,0 +1,100 @@
+import os
+import tempfile
+from nose import tools as ntools
+from draftfast.csv_parse import cache, salary_download
+from draftfast.rules import DRAFT_KINGS, DK_NFL_SHOWDOWN_RULE_SET
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+salaries = '{}/data/dk-nfl-salaries.csv'.format(CURRENT_DIR)
+projections = '{}/data/dk-nfl-projections.csv'.format(CURRENT_DIR)
+showdown_salaries = '{}/data/dk-nfl-showdown-salaries.csv'.format(
+    CURRENT_DIR,
+)
+
+
+def _fields(p):
+    return (p.solver_id, p.cost, p.proj, p.average_score, p.matchup,
+            p.possible_positions, p.multi_position, p.kv_store)
+
+
+def test_cache_matches_parse():
+    for location, ruleset in (
+        (salaries, None),
+        (showdown_salaries, DK_NFL_SHOWDOWN_RULE_SET),
+    ):
+        parsed = salary_download.generate_players_from_csvs(
+            salary_file_location=location,
+            projection_file_location=projections,
+            game=DRAFT_KINGS,
+            ruleset=ruleset,
+        )
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache.load_players(
+                location,
+                DRAFT_KINGS,
+                projection_file_location=projections,
+                ruleset=ruleset,
+                cache_dir=cache_dir,
+            )
+            ntools.assert_equals(len(os.listdir(cache_dir)), 1)
+
+            # a new process only finds the disk entry
+            cache.clear_memory()
+            cached = cache.load_players(
+                location,
+                DRAFT_KINGS,
+                projection_file_location=projections,
+                ruleset=ruleset,
+                cache_dir=cache_dir,
+            )
+        ntools.assert_equals(
+            [_fields(p) for p in cached],
+            [_fields(p) for p in parsed],
+        )
+
+
+def test_cache_loads_are_independent():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        first = cache.load_players(
+            salaries,
+            DRAFT_KINGS,
+            projection_file_location=projections,
+            cache_dir=cache_dir,
+        )
+        proj = first[0].proj
+        first[0].proj = 0
+        first[0].lock = True
+        first[0].kv_store['Name'] = 'changed'
+
+        # served from memory
+        second = cache.load_players(
+            salaries,
+            DRAFT_KINGS,
+            projection_file_location=projections,
+            cache_dir=cache_dir,
+        )
+        pool = cache.load_players(
+            salaries,
+            DRAFT_KINGS,
+            projection_file_location=projections,
+            cache_dir=cache_dir,
+            pool=True,
+        )
+    for player in (second[0], pool[0]):
+        ntools.assert_is_not(player, first[0])
+        ntools.assert_equals(player.proj, proj)
+        ntools.assert_false(player.lock)
+        ntools.assert_not_equals(player.kv_store['Name'], 'changed')
+
+
+def test_cache_key():
+    key = cache.fingerprint(salaries, game=DRAFT_KINGS)
+    ntools.assert_equals(key, cache.fingerprint(salaries, game=DRAFT_KINGS))
+    ntools.assert_not_equals(
+        key,
+        cache.fingerprint(salaries, projections, game=DRAFT_KINGS),
+    )
+    ntools.assert_not_equals(
+        key,
+        cache.fingerprint(salaries, game=DRAFT_KINGS, raw_columns=False),
+    )
@@ -1,11 +1,15 @@
 import os
 from nose import tools as ntools
 from draftfast.csv_parse import salary_download
-from draftfast.rules import DRAFT_KINGS
+from draftfast.csv_parse.projection_index import MIN_SIMILARITY
+from draftfast.player_pool import PlayerPool
+from draftfast.rules import DRAFT_KINGS, DK_NFL_SHOWDOWN_RULE_SET
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 salaries = '{}/data/nba-test-salaries.csv'.format(CURRENT_DIR)
 projections = '{}/data/nba-test-projections.csv'.format(CURRENT_DIR)
+nfl_salaries = '{}/data/dk-nfl-salaries.csv'.format(CURRENT_DIR)
+nfl_projections = '{}/data/dk-nfl-projections.csv'.format(CURRENT_DIR)
 
 
 def test_dk_nba_parse():
@@ -31,3 +35,80 @@ def test_dk_nba_use_proj():
         game=DRAFT_KINGS,
     )
     ntools.assert_equals(players[0].proj, 62.29)
+
+
+def test_dk_nba_raw_columns():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salaries,
+        game=DRAFT_KINGS,
+    )
+    ntools.assert_equals(players[0].kv_store['Name'], players[0].name)
+
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salaries,
+        game=DRAFT_KINGS,
+        raw_columns=False,
+    )
+    ntools.assert_equals(players[0].kv_store, {})
+
+
+def test_dk_showdown_shared_base():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location='{}/data/dk-nfl-showdown-salaries.csv'.format(
+            CURRENT_DIR,
+        ),
+        game=DRAFT_KINGS,
+        ruleset=DK_NFL_SHOWDOWN_RULE_SET,
+    )
+    captain, flex = sorted(
+        (p for p in players if p.name == 'Adam Vinatieri'),
+        key=lambda p: p.pos,
+    )
+    ntools.assert_true(captain.base is flex.base)
+    ntools.assert_equals((captain.pos, flex.pos), ('CPT', 'FLEX'))
+    ntools.assert_equals(captain.real_pos, 'K')
+    ntools.assert_equals((captain.cost, flex.cost), (4800, 3200))
+    ntools.assert_equals(captain.kv_store['Roster Position'], 'CPT')
+
+    # setting a field on one slot leaves the shared record alone
+    flex.proj = 1
+    ntools.assert_equals(flex.proj, 1)
+    ntools.assert_equals(captain.proj, 7.88)
+
+
+def test_dk_stream_players():
+    with open(salaries) as lines:
+        streamed = salary_download.stream_players(lines, DRAFT_KINGS)
+        first = next(streamed)
+        ntools.assert_equals(first.proj, 60.462)
+        ntools.assert_equals(len(list(streamed)), 220)
+
+    pool = salary_download.generate_players_from_csvs(
+        salary_file_location=salaries,
+        game=DRAFT_KINGS,
+        pool=True,
+    )
+    ntools.assert_true(isinstance(pool, PlayerPool))
+    ntools.assert_equals(len(pool), 221)
+    ntools.assert_equals(pool[0].solver_id, first.solver_id)
+
+
+def test_dk_fuzzy_projections_opt_in():
+    def by_name(**kwargs):
+        return dict(
+            (p.name, p.proj)
+            for p in salary_download.generate_players_from_csvs(
+                salary_file_location=nfl_salaries,
+                projection_file_location=nfl_projections,
+                game=DRAFT_KINGS,
+                **kwargs
+            )
+        )
+
+    exact = by_name()
+    fuzzy = by_name(min_similarity=MIN_SIMILARITY)
+    ntools.assert_equals(exact['Allen Robinson'], 0)
+    ntools.assert_not_equals(fuzzy['Allen Robinson'], 0)
+    for name, proj in exact.items():
+        if proj:
+            ntools.assert_equals(fuzzy[name], proj)
@@ -1,8 +1,14 @@
 import os
 from nose import tools as ntools
 from draftfast.optimize import run_multi
+from draftfast.exposure import ExposureTracker, LineupIncidence, \
+    LockScheduler, check_exposure
 from draftfast import rules
 from draftfast.csv_parse import salary_download
+from draftfast.dke_exceptions import PortfolioExposureException
+from draftfast.lineup_constraints import LineupConstraints
+from draftfast.portfolio import PortfolioOptimizer
+from draftfast.settings import OptimizerSettings
 
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 salary_file = '{}/data/dk-nfl-salaries.csv'.format(CURRENT_DIR)
@@ -53,3 +59,285 @@ def test_random_exposure_limits():
     )
     ntools.assert_equal(len(rosters), iterations)
     ntools.assert_equal(len(exposure_diffs), 0)
+
+
+def test_lock_scheduler():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    quarterbacks = ['Andrew Luck', 'Aaron Rodgers', 'Drew Brees']
+    exposure_bounds = [
+        {'name': name, 'min': 0.2, 'max': 0.3} for name in quarterbacks
+    ] + [
+        {'name': 'Not In Pool', 'min': 0.5, 'max': 1},
+    ]
+
+    schedule = LockScheduler(
+        players=players,
+        rule_set=rules.DK_NFL_RULE_SET,
+        exposure_bounds=exposure_bounds,
+        n=10,
+        random_seed=3,
+    )
+    ntools.assert_equal(schedule.shortfall, {})
+    for lineup in range(10):
+        locked = schedule.exposure_args(lineup)['locked']
+        ntools.assert_true(len(locked) <= 1)
+    for name in quarterbacks:
+        ntools.assert_equal(
+            sum(name in locks for locks in schedule.plan),
+            3,
+        )
+    ntools.assert_false(schedule.feasible(quarterbacks[:2]))
+    ntools.assert_true(schedule.feasible(quarterbacks[:1]))
+
+    rosters, _ = run_multi(
+        iterations=10,
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        exposure_bounds=exposure_bounds,
+        exposure_random_seed=3,
+        optimizer_settings=OptimizerSettings(),
+    )
+    ntools.assert_equal(len(rosters), 10)
+
+
+def test_lock_scheduler_max_exposure():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    exposure_bounds = [
+        {'name': 'Amari Cooper', 'min': 0, 'max': 0.3},
+        {'name': 'Andrew Luck', 'min': 0.2, 'max': 0.3},
+    ]
+    for max_workers, persistent_model in (
+        (None, False),
+        (None, True),
+        (2, False),
+    ):
+        rosters, _ = run_multi(
+            iterations=10,
+            rule_set=rules.DK_NFL_RULE_SET,
+            player_pool=players,
+            exposure_bounds=exposure_bounds,
+            exposure_random_seed=3,
+            max_workers=max_workers,
+            optimizer_settings=OptimizerSettings(
+                persistent_model=persistent_model,
+            ),
+        )
+        ntools.assert_equal(len(rosters), 10)
+        ntools.assert_equal(check_exposure(rosters, exposure_bounds), {})
+
+
+def test_persistent_model_matches_rebuild():
+    iterations = 5
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    exposure_bounds = [
+        {'name': 'Andrew Luck', 'min': 0.5, 'max': 0.7},
+        {'name': 'Alshon Jeffery', 'min': 1, 'max': 1},
+    ]
+    rosters, _ = run_multi(
+        iterations=iterations,
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        exposure_bounds=exposure_bounds,
+        optimizer_settings=OptimizerSettings(),
+    )
+    persistent_rosters, exposure_diffs = run_multi(
+        iterations=iterations,
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        exposure_bounds=exposure_bounds,
+        optimizer_settings=OptimizerSettings(persistent_model=True),
+    )
+    ntools.assert_equal(len(persistent_rosters), iterations)
+    ntools.assert_equal(len(exposure_diffs), 0)
+    ntools.assert_equal(
+        [round(r.projected(), 2) for r in rosters],
+        [round(r.projected(), 2) for r in persistent_rosters],
+    )
+    ntools.assert_equal(
+        len(set(r.identifier for r in persistent_rosters)),
+        iterations,
+    )
+
+
+def test_parallel_exposure_limits():
+    iterations = 6
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    exposure_bounds = [
+        {'name': 'Andrew Luck', 'min': 0.5, 'max': 0.7},
+        {'name': 'Alshon Jeffery', 'min': 1, 'max': 1},
+    ]
+    rosters, _ = run_multi(
+        iterations=iterations,
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        exposure_bounds=exposure_bounds,
+        optimizer_settings=OptimizerSettings(uniques=2),
+        max_workers=2,
+    )
+    ntools.assert_equal(len(rosters), iterations)
+    ntools.assert_equal(check_exposure(rosters, exposure_bounds), {})
+
+    for i, roster in enumerate(rosters):
+        for other in rosters[i + 1:]:
+            shared = set(p.solver_id for p in roster.players) & \
+                set(p.solver_id for p in other.players)
+            ntools.assert_true(
+                len(shared) <= rules.DK_NFL_RULE_SET.roster_size - 2
+            )
+
+
+def test_portfolio_exposure_limits():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    exposure_bounds = [
+        {'name': 'Andrew Luck', 'min': 0.5, 'max': 0.7},
+        {'name': 'Alshon Jeffery', 'min': 1, 'max': 1},
+    ]
+    settings = OptimizerSettings(portfolio=True, uniques=2)
+    rosters, exposure_diffs = run_multi(
+        iterations=3,
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        exposure_bounds=exposure_bounds,
+        optimizer_settings=settings,
+    )
+    ntools.assert_equal(len(rosters), 3)
+    ntools.assert_equal(check_exposure(rosters, exposure_bounds), {})
+    ntools.assert_equal(settings.existing_rosters, rosters)
+
+    projections = [r.projected() for r in rosters]
+    ntools.assert_equal(projections, sorted(projections, reverse=True))
+    for i, roster in enumerate(rosters):
+        for other in rosters[i + 1:]:
+            shared = set(roster.players) & set(other.players)
+            ntools.assert_true(len(shared) <= 7)
+
+    # no 3 lineups hold Andrew Luck between 1.2 and 1.8 times, and
+    # lineups solved one after another miss the bounds too
+    ntools.assert_raises(
+        PortfolioExposureException,
+        run_multi,
+        iterations=3,
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        exposure_bounds=[{'name': 'Andrew Luck', 'min': 0.4, 'max': 0.6}],
+        optimizer_settings=OptimizerSettings(portfolio=True),
+    )
+
+
+def test_portfolio_set_exposure():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    optimizer = PortfolioOptimizer(
+        players=players,
+        rule_set=rules.DK_NFL_RULE_SET,
+        settings=OptimizerSettings(),
+        lineup_constraints=LineupConstraints(),
+        lineups=2,
+    )
+    optimizer.build()
+    optimizer.set_exposure({
+        'locked': ['Andrew Luck'],
+        'banned': ['Alshon Jeffery'],
+    })
+    ntools.assert_true(optimizer.solve())
+    for lineup in range(2):
+        names = [
+            players[i].name for i in optimizer.selected_indices(lineup)
+        ]
+        ntools.assert_true('Andrew Luck' in names)
+        ntools.assert_false('Alshon Jeffery' in names)
+
+
+def test_exposure_tracker():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    exposure_bounds = [
+        {'name': 'Andrew Luck', 'min': 0.5, 'max': 0.7},
+    ]
+    rosters, _ = run_multi(
+        iterations=3,
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        exposure_bounds=exposure_bounds,
+        optimizer_settings=OptimizerSettings(),
+    )
+
+    tracker = ExposureTracker()
+    for roster in rosters:
+        tracker.add(roster)
+    ntools.assert_equal(tracker.lineups, 3)
+    ntools.assert_equal(tracker.players['Andrew Luck'], 2)
+    ntools.assert_equal(tracker.diffs(exposure_bounds), {})
+    ntools.assert_equal(
+        tracker.exposure_args(exposure_bounds, 4, False, None),
+        {'banned': ['Andrew Luck'], 'locked': []},
+    )
+
+    teams = [
+        [p.team for p in roster.players] for roster in rosters
+    ]
+    for team, lineups in tracker.teams.items():
+        ntools.assert_equal(lineups, sum(team in t for t in teams))
+    for stack in tracker.stacks:
+        ntools.assert_true(len(stack) >= 2)
+
+
+def test_lineup_incidence():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    rosters, _ = run_multi(
+        iterations=3,
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        optimizer_settings=OptimizerSettings(),
+    )
+
+    incidence = LineupIncidence.from_rosters(rosters)
+    ntools.assert_equal(incidence.matrix.shape[0], 3)
+    ntools.assert_equal(incidence.labels, sorted(incidence.labels))
+    co_exposure = incidence.co_exposure()
+    for i, a in enumerate(incidence.labels):
+        for j, b in enumerate(incidence.labels):
+            both = sum(a in r and b in r for r in rosters)
+            ntools.assert_equal(co_exposure[i, j], both)
+
+    teams = incidence.group(
+        lambda name: next(p.team for p in players if p.name == name)
+    )
+    by_team = LineupIncidence.from_rosters(rosters, key=lambda p: p.team)
+    ntools.assert_equal(teams.labels, by_team.labels)
+    ntools.assert_equal(teams.matrix.tolist(), by_team.matrix.tolist())
+    ntools.assert_equal(
+        by_team.exposure().tolist(),
+        [sum(t in [p.team for p in r.players] for r in rosters)
+         for t in by_team.labels],
+    )
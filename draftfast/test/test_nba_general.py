@@ -66,3 +66,31 @@ def test_optimize_with_general():
         ntools.assert_true(get_player_count_at_pos(rosters[i], 'G') in [3, 4])
         ntools.assert_true(get_player_count_at_pos(rosters[i], 'F') in [3, 4])
         ntools.assert_true(get_player_count_at_pos(rosters[i], 'C') in [1, 2])
+
+
+def test_optimize_wnba_general():
+    dk_pool = [
+        Player(name='G{}'.format(i), cost=5000, proj=20 + i, pos=pos)
+        for i, pos in enumerate(['PG', 'SG'] * 3)
+    ] + [
+        Player(name='F{}'.format(i), cost=5000, proj=10 + i, pos=pos)
+        for i, pos in enumerate(['SF', 'PF'] * 3)
+    ]
+    fd_pool = [
+        Player(name='G{}'.format(i), cost=5000, proj=20 + i, pos='G')
+        for i in range(5)
+    ] + [
+        Player(name='F{}'.format(i), cost=5000, proj=10 + i, pos='F')
+        for i in range(6)
+    ]
+
+    for rule_set, pool, guards in (
+        (rules.DK_WNBA_RULE_SET, dk_pool, 3),
+        (rules.FD_WNBA_RULE_SET, fd_pool, 3),
+    ):
+        roster = run(rule_set=rule_set, player_pool=pool)
+        ntools.assert_not_equal(roster, None)
+        ntools.assert_equal(len(roster.players), rule_set.roster_size)
+        general = [p.nba_general_position for p in roster.players]
+        ntools.assert_equal(general.count('G'), guards)
+        ntools.assert_equal(general.count('C'), 0)
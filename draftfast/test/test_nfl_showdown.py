@@ -1,9 +1,10 @@
 from nose import tools as ntools
-from draftfast.optimize import run
+from draftfast.optimize import run, run_multi
 from draftfast import rules
 from draftfast.orm import Player
 from draftfast.settings import OptimizerSettings
 from draftfast.showdown.orm import ShowdownPlayer
+from draftfast.showdown.showdown_optimizer import SHOWDOWN_SOLVER
 from draftfast.lineup_constraints import LineupConstraints
 
 
@@ -224,3 +225,69 @@ def test_nfl_showdown_ban_specific():
         and x.name == 'A1'
     ][0]
     ntools.assert_equal('A1', flex.name)
+
+
+def test_nfl_showdown_exact_matches_mip():
+    for settings in (
+        dict(),
+        dict(no_defense_against_captain=True),
+        dict(no_defense_against_captain=True, uniques=2),
+    ):
+        projections = []
+        for exact in (True, False):
+            rosters, _ = run_multi(
+                iterations=5,
+                rule_set=rules.DK_NFL_SHOWDOWN_RULE_SET,
+                player_pool=_build_mock_player_pool(),
+                optimizer_settings=OptimizerSettings(
+                    exact_showdown=exact,
+                    collect_stats=True,
+                    **settings
+                ),
+                constraints=LineupConstraints(banned=['A2']),
+            )
+            ntools.assert_equal(
+                rosters[0].stats.solver == SHOWDOWN_SOLVER,
+                exact,
+            )
+            projections.append([r.projected() for r in rosters])
+
+        ntools.assert_equal(projections[0], projections[1])
+
+
+def test_nfl_showdown_groups_use_mip():
+    roster = run(
+        rule_set=rules.DK_NFL_SHOWDOWN_RULE_SET,
+        player_pool=_build_mock_player_pool(),
+        optimizer_settings=OptimizerSettings(collect_stats=True),
+        constraints=LineupConstraints(
+            groups=[[('A14', 'A21', 'A31'), 2]],
+        ),
+    )
+    ntools.assert_not_equal(roster.stats.solver, SHOWDOWN_SOLVER)
+    ntools.assert_equal(
+        len([n for n in ('A14', 'A21', 'A31') if n in roster]),
+        2,
+    )
+
+
+def test_nfl_showdown_locked_captains_use_mip():
+    constraints = LineupConstraints(
+        position_locked=['A1 CPT X', 'A2 CPT X'],
+    )
+    results = []
+    for exact in (True, False):
+        roster = run(
+            rule_set=rules.DK_NFL_SHOWDOWN_RULE_SET,
+            player_pool=_build_mock_player_pool(),
+            optimizer_settings=OptimizerSettings(
+                exact_showdown=exact,
+                collect_stats=True,
+            ),
+            constraints=constraints,
+        )
+        if roster is not None:
+            ntools.assert_not_equal(roster.stats.solver, SHOWDOWN_SOLVER)
+        results.append(roster and roster.projected())
+
+    ntools.assert_equal(results[0], results[1])
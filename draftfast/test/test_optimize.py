@@ -1,12 +1,16 @@
 import os
 from copy import deepcopy
 from nose import tools as ntools
-from draftfast.optimize import run
-from draftfast import rules
+from draftfast.optimize import run, run_multi, run_top_k, \
+    reset_player_ban_lock
+from draftfast.optimizer import RosterIndex, _opponents
+from draftfast import rules, solvers
 from draftfast.orm import Player
 from draftfast.csv_parse import salary_download
-from draftfast.settings import OptimizerSettings, Stack
+from draftfast.settings import OptimizerSettings, PlayerPoolSettings, \
+    Stack, PAIRWISE, BIG_M
 from draftfast.lineup_constraints import LineupConstraints
+from draftfast.dke_exceptions import UnsupportedSolverException
 
 mock_nba_pool = [
     Player(name='A1', cost=5500, proj=40, pos='PG'),
@@ -821,3 +825,345 @@ def test_no_mutate_side_Effect():
     )
     brady = next((p for p in players if p.name == 'Tom Brady'))
     ntools.assert_equal(brady.lock, False)
+
+
+def test_reset_player_ban_lock():
+    pool = deepcopy(mock_nba_pool)
+    pool[0].lock = True
+    pool[1].ban = True
+    reset_player_ban_lock(pool)
+    ntools.assert_false(any(p.lock or p.ban for p in pool))
+
+
+def test_pool_players_shared_not_mutated():
+    pool = deepcopy(mock_nba_pool)
+    rosters, _ = run_multi(
+        iterations=2,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=pool,
+        constraints=LineupConstraints(locked=['A1'], banned=['A2']),
+        exposure_bounds=[{'name': 'A3', 'min': 1, 'max': 1}],
+        optimizer_settings=OptimizerSettings(),
+    )
+    ntools.assert_equal(len(rosters), 2)
+    ntools.assert_false(any(p.lock or p.ban for p in pool))
+
+    # locks are shown on the roster's own copies
+    a1 = next(p for p in rosters[0].players if p.name == 'A1')
+    ntools.assert_true(a1.lock)
+    ntools.assert_false(any(p is a1 for p in pool))
+    a11 = next(p for p in rosters[0].players if p.name == 'A11')
+    ntools.assert_true(any(p is a11 for p in pool))
+
+
+def test_solver_backends():
+    for backend in (solvers.CBC, solvers.SCIP, solvers.CP_SAT):
+        roster = run(
+            rule_set=rules.DK_NFL_RULE_SET,
+            player_pool=mock_nfl_pool,
+            optimizer_settings=OptimizerSettings(
+                solver=backend,
+                solver_threads=2,
+            ),
+        )
+        ntools.assert_not_equal(roster, None)
+        ntools.assert_equal(roster.projected(), 420.0)
+
+
+@ntools.raises(UnsupportedSolverException)
+def test_unknown_solver_backend():
+    run(
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=mock_nfl_pool,
+        optimizer_settings=OptimizerSettings(solver='GLOP'),
+    )
+
+
+def test_top_k():
+    rosters = run_top_k(
+        k=5,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(),
+    )
+    multi_rosters, _ = run_multi(
+        iterations=5,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(),
+    )
+    ntools.assert_equal(
+        [r.projected() for r in rosters],
+        [r.projected() for r in multi_rosters],
+    )
+    ntools.assert_equal(len(set(r.identifier for r in rosters)), 5)
+
+
+def test_top_k_locked_players():
+    pool = deepcopy(mock_nba_pool)
+    rosters = run_top_k(
+        k=3,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=pool,
+        constraints=LineupConstraints(locked=['A1']),
+        optimizer_settings=OptimizerSettings(),
+    )
+    ntools.assert_equal(len(rosters), 3)
+    for roster in rosters:
+        a1 = next(p for p in roster.players if p.name == 'A1')
+        ntools.assert_true(a1.lock)
+    ntools.assert_false(any(p.lock for p in pool))
+
+
+def test_top_k_uniques():
+    rosters = run_top_k(
+        k=4,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(uniques=2),
+    )
+    ntools.assert_equal(len(rosters), 4)
+    ntools.assert_equal(rosters[0].projected(), 370)
+    for i, roster in enumerate(rosters):
+        for other in rosters[i + 1:]:
+            shared = set(roster.players).intersection(other.players)
+            ntools.assert_true(
+                len(shared) <= rules.DK_NBA_RULE_SET.roster_size - 2
+            )
+
+
+def test_lazy_uniqueness():
+    for persistent_model in (False, True):
+        for uniques in (None, 2):
+            expected, _ = run_multi(
+                iterations=4,
+                rule_set=rules.DK_NBA_RULE_SET,
+                player_pool=mock_nba_pool,
+                optimizer_settings=OptimizerSettings(
+                    uniques=uniques,
+                    persistent_model=persistent_model,
+                ),
+            )
+            rosters, _ = run_multi(
+                iterations=4,
+                rule_set=rules.DK_NBA_RULE_SET,
+                player_pool=mock_nba_pool,
+                optimizer_settings=OptimizerSettings(
+                    uniques=uniques,
+                    persistent_model=persistent_model,
+                    lazy_uniqueness=True,
+                ),
+            )
+            ntools.assert_equal(
+                [r.projected() for r in rosters],
+                [r.projected() for r in expected],
+            )
+            ntools.assert_equal(len(set(r.identifier for r in rosters)), 4)
+
+
+def test_roster_index():
+    index = RosterIndex(20)
+    index.add([0, 1, 2, 3])
+    index.add([2, 3, 4, 5])
+    index.add([10, 11, 19])
+    ntools.assert_equal(len(index), 3)
+    ntools.assert_equal(index.overlaps([1, 2, 3, 19]).tolist(), [3, 2, 1])
+    ntools.assert_equal(index.violated([1, 2, 3, 19], 2), [[0, 1, 2, 3]])
+    ntools.assert_equal(index.violated([6, 7], 0), [])
+
+    for i in range(20):
+        index.add([i])
+    ntools.assert_equal(len(index), 23)
+    ntools.assert_equal(index.overlaps([19]).sum(), 2)
+
+
+def test_no_opposing_def_big_m():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+
+    teams = set(p.team for p in players if p.team)
+    constraints = dict()
+    for formulation in (PAIRWISE, BIG_M):
+        roster = run(
+            rule_set=rules.DK_NFL_RULE_SET,
+            player_pool=players,
+            optimizer_settings=OptimizerSettings(
+                no_offense_against_defense=True,
+                no_opp_defense_formulation=formulation,
+                collect_stats=True,
+            ),
+            constraints=LineupConstraints(
+                locked=['Bengals']
+            ),
+        )
+
+        ntools.assert_equal(round(roster.projected(), 2), 106.9)
+        for p in roster.players:
+            if p.pos in rules.DK_NFL_RULE_SET.offensive_positions:
+                ntools.assert_true('CIN' not in _opponents(p, teams))
+        constraints[formulation] = roster.stats.constraints
+
+    ntools.assert_true(constraints[BIG_M] < constraints[PAIRWISE])
+
+
+def test_prune_dominated():
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    roster = run(
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        optimizer_settings=OptimizerSettings(
+            min_teams=1,
+            prune_dominated=True,
+            collect_stats=True,
+        ),
+    )
+    unpruned = run(
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        optimizer_settings=OptimizerSettings(
+            min_teams=1,
+            collect_stats=True,
+        ),
+    )
+    ntools.assert_equal(round(roster.projected(), 2), 124.30)
+    ntools.assert_equal(
+        round(roster.projected(), 2),
+        round(unpruned.projected(), 2),
+    )
+    ntools.assert_true(roster.stats.variables < unpruned.stats.variables)
+
+
+def test_time_limit_and_mip_gap():
+    roster = run(
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(time_limit=10),
+    )
+    ntools.assert_equal(roster.projected(), 370)
+    ntools.assert_true(roster.proven_optimal)
+
+    # the gap closes although mip_gap allowed stopping short
+    roster = run(
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(mip_gap=0.1),
+    )
+    ntools.assert_equal(roster.projected(), 370)
+    ntools.assert_true(roster.proven_optimal)
+
+    players = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    roster = run(
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=players,
+        optimizer_settings=OptimizerSettings(mip_gap=0.1, collect_stats=True),
+    )
+    ntools.assert_true(roster.stats.gap > 0)
+    ntools.assert_false(roster.proven_optimal)
+    ntools.assert_false(roster.stats.proven_optimal)
+
+
+def test_total_time_limit():
+    rosters, _ = run_multi(
+        iterations=3,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(total_time_limit=60),
+    )
+    ntools.assert_equal(len(rosters), 3)
+
+    rosters, _ = run_multi(
+        iterations=3,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(total_time_limit=0),
+    )
+    ntools.assert_equal(rosters, [])
+
+
+def test_collect_stats():
+    stats = []
+    roster = run(
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(stats_callback=stats.append),
+    )
+    ntools.assert_equal(stats, [roster.stats])
+    ntools.assert_true(roster.stats.variables > 0)
+    ntools.assert_true(roster.stats.constraints > 0)
+    ntools.assert_true(roster.stats.proven_optimal)
+    ntools.assert_equal(round(roster.stats.objective, 2), 370)
+    ntools.assert_true(roster.stats.total_time >= roster.stats.solve_time)
+
+    rosters, _ = run_multi(
+        iterations=3,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(
+            collect_stats=True,
+            persistent_model=True,
+        ),
+    )
+    ntools.assert_equal(len(rosters), 3)
+    ntools.assert_true(rosters[0].stats.build_time > 0)
+    ntools.assert_equal(rosters[1].stats.build_time, 0)
+    ntools.assert_equal(rosters[1].stats.pool_time, 0)
+
+    roster = run(
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=mock_nba_pool,
+        optimizer_settings=OptimizerSettings(),
+    )
+    ntools.assert_equal(roster.stats, None)
+
+
+def test_randomize_persistent_model():
+    pool = mock_nba_pool + [
+        Player(name='B{}'.format(i), cost=5000, proj=40 + i, pos=pos)
+        for i, pos in enumerate(['PG', 'SG', 'SF', 'PF', 'C'] * 2)
+    ]
+    rosters, _ = run_multi(
+        iterations=5,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=pool,
+        exposure_random_seed=7,
+        player_settings=PlayerPoolSettings(randomize=0.2),
+        optimizer_settings=OptimizerSettings(persistent_model=True),
+    )
+    ntools.assert_equal(len(rosters), 5)
+    ntools.assert_equal(len(set(r.identifier for r in rosters)), 5)
+
+    base = dict((p.name, p.proj) for p in pool)
+    for roster in rosters:
+        for p in roster.players:
+            ntools.assert_true(0.8 * base[p.name] <= p.proj)
+            ntools.assert_true(p.proj <= 1.2 * base[p.name])
+    ntools.assert_true(any(
+        p.proj != base[p.name] for p in rosters[0].players
+    ))
+    # the caller's pool keeps its projections
+    ntools.assert_equal(pool[0].proj, 40)
+
+    # draws are seeded through the random module
+    again, _ = run_multi(
+        iterations=5,
+        rule_set=rules.DK_NBA_RULE_SET,
+        player_pool=pool,
+        exposure_random_seed=7,
+        player_settings=PlayerPoolSettings(randomize=0.2),
+        optimizer_settings=OptimizerSettings(persistent_model=True),
+    )
+    ntools.assert_equal(
+        [r.projected() for r in again],
+        [r.projected() for r in rosters],
+    )
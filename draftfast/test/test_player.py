@@ -5,3 +5,19 @@ from draftfast.orm import Player
 def test_player_value():
     pg = Player(name='A', cost=5500, proj=55, pos='PG')
     ntools.assert_equal(pg.value, 10)
+
+
+def test_player_cached_keys():
+    pg = Player(name='A B', cost=5500, proj=55, pos='PG', team='nyk')
+    ntools.assert_false(hasattr(pg, '__dict__'))
+    ntools.assert_equal(pg.solver_id, 'A B PG NYK')
+    ntools.assert_equal(pg.nba_general_position, 'G')
+    ntools.assert_equal(pg.short_name, 'A. B')
+
+    # derived keys follow the fields they come from
+    pg.pos = 'SF'
+    ntools.assert_equal(pg.solver_id, 'A B SF NYK')
+    ntools.assert_equal(pg.nba_general_position, 'F')
+
+    other = Player(name='C', cost=5500, pos='PG', team='nyk')
+    ntools.assert_true(other.team is pg.team)
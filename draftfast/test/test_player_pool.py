@@ -1,8 +1,10 @@
 import random
 from nose import tools as ntools
-from draftfast.player_pool import filter_pool
+from draftfast import rules
+from draftfast.player_pool import filter_pool, prune_dominated, PlayerPool
 from draftfast.orm import Player
-from draftfast.settings import PlayerPoolSettings
+from draftfast.settings import PlayerPoolSettings, OptimizerSettings
+from draftfast.lineup_constraints import LineupConstraints
 
 
 p_a, p_b, p_c = [
@@ -47,3 +49,89 @@ def test_randomize():
         pool[0].proj,
         18.537456976449604
     )
+
+
+def test_player_pool_filter():
+    pool = PlayerPool(mock_player_pool)
+    for settings in (
+        PlayerPoolSettings(),
+        PlayerPoolSettings(min_proj=25, max_salary=9000),
+        PlayerPoolSettings(min_salary=6000),
+    ):
+        ntools.assert_equals(
+            list(filter_pool(pool, settings)),
+            filter_pool(mock_player_pool, settings),
+        )
+
+    # locked players pass every filter
+    locked = PlayerPool([
+        Player(name='L1', cost=3000, proj=5, pos='PG', lock=True),
+        p_b,
+    ])
+    ntools.assert_equals(
+        [p.name for p in locked.filter(PlayerPoolSettings(min_proj=10))],
+        ['L1', 'A2'],
+    )
+
+
+def test_player_pool_randomize():
+    random.seed(1)
+    pool = PlayerPool(mock_player_pool)
+    randomized = pool.filter(PlayerPoolSettings(randomize=0.1))
+    for base, player in zip(mock_player_pool, randomized):
+        ntools.assert_true(player is not base)
+        ntools.assert_true(0.9 * base.proj <= player.proj <= 1.1 * base.proj)
+    ntools.assert_equals(p_a.proj, 20)
+
+    # unchanged rows are the pool's own players
+    view = pool.take([2])
+    ntools.assert_true(view[0] is p_c)
+    labels, codes = view.encoded('name')
+    ntools.assert_equals((labels, codes.tolist()), (['A3'], [0]))
+
+
+def test_prune_dominated():
+    pool = [
+        Player(name='C1', cost=5000, proj=30, pos='C'),
+        Player(name='C2', cost=5500, proj=35, pos='C'),
+        Player(name='C3', cost=6000, proj=30, pos='C'),
+        Player(name='C4', cost=6500, proj=20, pos='C'),
+        Player(name='PG1', cost=9000, proj=10, pos='PG'),
+    ]
+    settings = OptimizerSettings(min_teams=1)
+
+    # C can fill two slots, so C3 and C4 both have two dominators
+    pruned = prune_dominated(
+        pool,
+        rule_set=rules.DK_NBA_RULE_SET,
+        optimizer_settings=settings,
+        lineup_constraints=LineupConstraints(),
+    )
+    ntools.assert_equals([p.name for p in pruned], ['C1', 'C2', 'PG1'])
+
+    # locked players are kept and banned players dominate nobody
+    pruned = prune_dominated(
+        pool,
+        rule_set=rules.DK_NBA_RULE_SET,
+        optimizer_settings=settings,
+        lineup_constraints=LineupConstraints(locked=['C4'], banned=['C1']),
+    )
+    ntools.assert_equals(
+        [p.name for p in pruned],
+        ['C1', 'C2', 'C3', 'C4', 'PG1'],
+    )
+
+
+def test_prune_dominated_by_team():
+    pool = [
+        Player(name='C1', cost=5000, proj=30, pos='C', team='X'),
+        Player(name='C2', cost=5500, proj=35, pos='C', team='X'),
+        Player(name='C3', cost=6000, proj=30, pos='C', team='Y'),
+    ]
+    pruned = prune_dominated(
+        pool,
+        rule_set=rules.DK_NBA_RULE_SET,
+        optimizer_settings=OptimizerSettings(min_teams=2),
+        lineup_constraints=LineupConstraints(),
+    )
+    ntools.assert_equals(pruned, pool)
@@ -0,0 +1,43 @@
+from nose import tools as ntools
+from draftfast.csv_parse.projection_index import ProjectionIndex, \
+    normalize, MIN_SIMILARITY, NORMALIZED, FUZZY
+
+
+def test_normalize():
+    ntools.assert_equals(normalize('D.J. Moore Jr.'), 'dj moore')
+    ntools.assert_equals(normalize("De'Aaron Fox"), 'deaaron fox')
+    ntools.assert_equals(normalize('Nikola Jokić'), 'nikola jokic')
+    ntools.assert_equals(
+        normalize('Marvin Jones Jr. DET '),
+        'marvin jones det',
+    )
+
+
+def test_projection_index_lookup():
+    index = ProjectionIndex({
+        'Russell Wilson SEA ': 20.6,
+        'Kelly Oubre': 15.3,
+        'Todd Gurley LAR': 14.1,
+        'Juancho Hernangomez': 8.0,
+        'Jeff Green': 10.0,
+        'Gerald Green': 12.0,
+    }, min_similarity=MIN_SIMILARITY)
+    ntools.assert_equals(index.lookup('Jeff Green'), 10.0)
+    ntools.assert_equals(index.lookup('Russell Wilson', 'sea'), 20.6)
+    ntools.assert_equals(index.lookup('Kelly Oubre Jr.'), 15.3)
+    ntools.assert_equals(index.lookup('Todd Gurley II', 'LAR'), 14.1)
+    ntools.assert_equals(index.lookup('Juancho Hernangómez'), 8.0)
+    ntools.assert_equals(index.lookup('Juancho Hernangmez'), 8.0)
+    ntools.assert_equals(index.lookup('Draymond Green'), None)
+
+    ntools.assert_equals(index.matches['Kelly Oubre Jr.'],
+                         ('Kelly Oubre', NORMALIZED))
+    ntools.assert_equals(index.matches['Juancho Hernangmez'],
+                         ('Juancho Hernangomez', FUZZY))
+    ntools.assert_not_in('Jeff Green', index.matches)
+    ntools.assert_equals(index.unmatched, ['Draymond Green'])
+    ntools.assert_in('No projection for Draymond Green', index.report())
+
+    exact = ProjectionIndex({'Juancho Hernangomez': 8.0})
+    ntools.assert_equals(exact.lookup('Juancho Hernangmez'), None)
+    ntools.assert_equals(exact.lookup('Juancho Hernangómez'), 8.0)
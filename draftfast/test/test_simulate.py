@@ -0,0 +1,68 @@
+import os
+from nose import tools as ntools
+from draftfast import rules
+from draftfast.csv_parse import salary_download
+from draftfast.orm import Player
+from draftfast.settings import OptimizerSettings
+from draftfast.simulate import simulate, correlation_matrix
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+salary_file = '{}/data/dk-nfl-salaries.csv'.format(CURRENT_DIR)
+projection_file = '{}/data/dk-nfl-projections.csv'.format(CURRENT_DIR)
+
+mock_nfl_pool = [
+    Player(name='QB1', cost=5000, proj=20, pos='QB', team='NE',
+           matchup='NE@KC'),
+    Player(name='WR1', cost=5000, proj=15, pos='WR', team='NE',
+           matchup='NE@KC'),
+    Player(name='D1', cost=3000, proj=8, pos='DST', team='KC',
+           matchup='NE@KC'),
+    Player(name='RB1', cost=5000, proj=15, pos='RB', team='SEA',
+           matchup='SEA@SF'),
+]
+
+
+def test_correlation_matrix():
+    correlation = correlation_matrix(mock_nfl_pool, rules.DK_NFL_RULE_SET)
+    ntools.assert_equal(correlation.shape, (4, 4))
+    ntools.assert_equal(correlation[0, 1], 0.2)
+    ntools.assert_equal(correlation[0, 2], -0.3)
+    ntools.assert_equal(correlation[2, 0], -0.3)
+    ntools.assert_equal(correlation[0, 3], 0)
+    ntools.assert_equal(correlation[3, 3], 1)
+
+
+def test_simulate():
+    slate = salary_download.generate_players_from_csvs(
+        salary_file_location=salary_file,
+        projection_file_location=projection_file,
+        game=rules.DRAFT_KINGS,
+    )
+    result = simulate(
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=slate,
+        iterations=30,
+        optimizer_settings=OptimizerSettings(),
+        random_seed=1,
+    )
+    ntools.assert_equal(result.iterations, 30)
+    ntools.assert_equal(result.infeasible, 0)
+    ntools.assert_equal(
+        sum(result.player_counts.values()),
+        30 * rules.DK_NFL_RULE_SET.roster_size,
+    )
+    frequency = list(result.player_frequency().values())
+    ntools.assert_equal(frequency, sorted(frequency, reverse=True))
+    ntools.assert_true(frequency[0] <= 1)
+    ntools.assert_true(result.stack_frequency())
+
+    # workers solve the same draws
+    parallel = simulate(
+        rule_set=rules.DK_NFL_RULE_SET,
+        player_pool=slate,
+        iterations=30,
+        optimizer_settings=OptimizerSettings(),
+        random_seed=1,
+        max_workers=2,
+    )
+    ntools.assert_equal(parallel.player_counts, result.player_counts)